@@ -1,5 +1,6 @@
 import argparse
-from typing import List, Optional
+import functools
+from typing import Any, List, Optional, Tuple
 
 class Command:
     """Base class for all commands."""
@@ -62,8 +63,15 @@ class CommandParser:
                               help="Set the GUI theme (light, dark, or system)")
         gui_parser.add_argument("--debug", action="store_true", help="Enable debug mode")
 
+        # Repeated argument lists skip argparse; commands are still built fresh on every parse
+        self._parse_cached = functools.lru_cache(maxsize=128)(self._parse_args)
+
+    def _parse_args(self, args: Tuple[str, ...]) -> Tuple[Tuple[str, Any], ...]:
+        """Run argparse on args and return the parsed values as hashable (name, value) pairs."""
+        return tuple(vars(self.parser.parse_args(list(args))).items())
+
     def parse(self, args: List[str]) -> Command:
-        parsed_args = self.parser.parse_args(args)
+        parsed_args = argparse.Namespace(**dict(self._parse_cached(tuple(args))))
         if parsed_args.command == "analyze":
             return AnalyzeCommand(parsed_args.file_path)
         elif parsed_args.command == "export":
@@ -5,8 +5,37 @@ Handles formatting of output data in various formats.
 """
 
 import json
+import re
 from typing import List, Dict, Any
 
+try:
+    import orjson  # Faster JSON encoder, used by JSONFormatter when installed
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# orjson writes NaN and Infinity as null and floats like 1e16 without json's "+" and zero
+# padding, so output containing null or an exponent is re-encoded with json to be safe
+_ORJSON_EXPONENT_PATTERN = re.compile(rb'e-?[0-9]')
+
+# Hand these types to _orjson_default instead of serializing them; json.dumps rejects them
+_ORJSON_OPTIONS = (orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+                   | orjson.OPT_PASSTHROUGH_SUBCLASS) if ORJSON_AVAILABLE else 0
+
+def _orjson_default(obj: Any) -> Any:
+    """Reject every type orjson can't encode natively, so JSONFormatter falls back to json."""
+    raise TypeError(f"Object of type {type(obj).__name__} is not handled by orjson")
+
+def _double_indent(text: str) -> str:
+    """Turn orjson's 2-space indentation into json.dumps' 4 spaces."""
+    depth = 0
+    while '\n' + '  ' * (depth + 1) in text:
+        depth += 1
+    # Deepest level first, so each line gains two spaces per level it is nested in
+    for level in range(depth, 0, -1):
+        text = text.replace('\n' + '  ' * level, '\n' + '  ' * (level + 1))
+    return text
+
 class TableFormatter:
     """Formatter for table output."""
     
@@ -25,20 +54,19 @@ class TableFormatter:
         # Get column names from the first row
         columns = list(data[0].keys())
         
-        # Calculate column widths
-        column_widths = {col: len(col) for col in columns}
-        for row in data:
-            for col in columns:
-                column_widths[col] = max(column_widths[col], len(str(row[col])))
+        # Convert every cell to a string once; the widths and the rows both use these
+        cells = [[str(row[col]) for col in columns] for row in data]
+        
+        # Calculate column widths, one column at a time
+        column_widths = [max(len(col), *map(len, column)) for col, column in zip(columns, zip(*cells))]
         
         # Create table header
-        header = " | ".join(f"{col:{column_widths[col]}}" for col in columns)
-        separator = "-+-".join("-" * column_widths[col] for col in columns)
+        header = " | ".join(f"{col:{width}}" for col, width in zip(columns, column_widths))
+        separator = "-+-".join("-" * width for width in column_widths)
         
         # Create table rows
-        rows = []
-        for row in data:
-            rows.append(" | ".join(f"{str(row[col]):{column_widths[col]}}" for col in columns))
+        rows = [" | ".join(f"{cell:{width}}" for cell, width in zip(row_cells, column_widths))
+                for row_cells in cells]
         
         # Combine header, separator, and rows
         table = f"{header}\n{separator}\n" + "\n".join(rows)
@@ -56,6 +84,18 @@ class JSONFormatter:
         Returns:
             Formatted JSON as a string
         """
+        if ORJSON_AVAILABLE:
+            # Use orjson only when its output matches json.dumps(indent=4); anything it rejects
+            # (big integers, non-string keys, datetimes, ...) or may write differently (non-ASCII,
+            # NaN, exponent floats) goes through json instead. uuid.UUID and plain Enum values are
+            # the exception: orjson encodes them where json raises TypeError.
+            try:
+                encoded = orjson.dumps(data, default=_orjson_default, option=_ORJSON_OPTIONS)
+            except TypeError:
+                encoded = None
+            if (encoded is not None and encoded.isascii() and b'\x7f' not in encoded
+                    and b'null' not in encoded and not _ORJSON_EXPONENT_PATTERN.search(encoded)):
+                return _double_indent(encoded.decode())
         return json.dumps(data, indent=4)
 
 class TextFormatter:
@@ -70,7 +110,14 @@ class TextFormatter:
         Returns:
             Formatted plain text as a string
         """
+        # One newline-terminated line template per distinct set of keys, with any braces in the keys escaped
+        templates = {}
         lines = []
         for row in data:
-            lines.append(", ".join(f"{key}: {value}" for key, value in row.items()))
-        return "\n".join(lines)
+            keys = tuple(row)
+            template = templates.get(keys)
+            if template is None:
+                template = templates[keys] = ", ".join(
+                    f"{key}".replace("{", "{{").replace("}", "}}") + ": {}" for key in keys) + "\n"
+            lines.append(template.format(*row.values()))
+        return "".join(lines)
@@ -1,10 +1,15 @@
+import bisect
 import cmd
+import functools
 import readline
 import os
+from typing import List, Tuple
 
 class InteractiveCLI(cmd.Cmd):
     intro = "Welcome to the Phone Records Analyzer CLI. Type help or ? to list commands.\n"
     prompt = "(analyzer) "
+    # Flags offered when completing each command's arguments
+    command_flags = {'export': ['--format=csv', '--format=json']}
 
     def __init__(self):
         super().__init__()
@@ -12,6 +17,12 @@ class InteractiveCLI(cmd.Cmd):
         self.history_file = os.path.expanduser("~/.textymctextface_history")
         self.load_command_history()
 
+        # Sorted completion candidates, so a prefix lookup is a binary search rather than a scan.
+        # Commands are fixed do_* methods, so the cache never needs invalidating.
+        self._command_names = sorted(name[3:] for name in self.get_names() if name.startswith('do_'))
+        self._command_flags = {command: sorted(flags) for command, flags in self.command_flags.items()}
+        self._complete_cached = functools.lru_cache(maxsize=128)(self._complete)
+
     def do_analyze(self, arg):
         "Analyze phone records: analyze <file_path>"
         print(f"Analyzing file: {arg}")
@@ -53,11 +64,24 @@ class InteractiveCLI(cmd.Cmd):
         self.command_history = []
         open(self.history_file, 'w').close()
 
+    def line_completions(self, line: str) -> List[str]:
+        "Complete the last word of a partial line (e.g. 'ex' or 'export --f') to command names or flags"
+        return list(self._complete_cached(line))
+
+    def _complete(self, line: str) -> Tuple[str, ...]:
+        words = line.split()
+        prefix = '' if not words or line.endswith(' ') else words[-1]
+        if not words or (len(words) == 1 and not line.endswith(' ')):
+            candidates = self._command_names
+        else:
+            candidates = self._command_flags.get(words[0], [])
+        # Everything starting with prefix sits between prefix and prefix + the highest code point
+        start = bisect.bisect_left(candidates, prefix)
+        end = bisect.bisect_right(candidates, prefix + chr(0x10FFFF), start)
+        return tuple(candidates[start:end])
+
     def complete_export(self, text, line, begidx, endidx):
-        options = ['--format=csv', '--format=json']
-        if not text:
-            return options
-        return [option for option in options if option.startswith(text)]
+        return [option for option in self.command_flags['export'] if option.startswith(text)]
 
 if __name__ == '__main__':
     InteractiveCLI().cmdloop()
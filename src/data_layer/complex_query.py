@@ -362,7 +362,8 @@ class QueryBuilder:
 
             # Apply grouping and aggregation
             if self.group_columns and self.aggregations:
-                result = result.groupby(self.group_columns).agg(self.aggregations)
+                # observed=True keeps unused categories of categorical keys out of the result
+                result = result.groupby(self.group_columns, observed=True).agg(self.aggregations)
                 # Flatten column names if MultiIndex
                 if isinstance(result.columns, pd.MultiIndex):
                     result.columns = [f"{col[0]}_{col[1]}" if isinstance(col, tuple) else col for col in result.columns]
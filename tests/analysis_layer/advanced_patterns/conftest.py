@@ -0,0 +1,16 @@
+"""
+Shared fixtures for the ResponseAnalyzer test modules.
+"""
+import pytest
+
+from src.analysis_layer.advanced_patterns.response_analyzer import ResponseAnalyzer
+
+
+@pytest.fixture(scope="session")
+def analyzer():
+    """Create a ResponseAnalyzer shared across the session.
+
+    Only for tests that read analysis results; tests that inspect last_error
+    or attach an ML service should create their own instance.
+    """
+    return ResponseAnalyzer()
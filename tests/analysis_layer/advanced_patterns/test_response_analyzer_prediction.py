@@ -4,52 +4,48 @@ Tests for the response behavior prediction functionality of the ResponseAnalyzer
 This module contains tests for the predict_response_behavior method of the ResponseAnalyzer.
 """
 
+import importlib.util
+
 import pytest
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from unittest.mock import MagicMock, patch
 
 from src.analysis_layer.advanced_patterns.response_analyzer import ResponseAnalyzer
-from src.analysis_layer.ml_model_service import MLModelService
 from src.analysis_layer.ml_exceptions import MLError, PredictionError
+from tests.utils.fixture_cache import load_cached_frame
 
-
-@pytest.fixture
+@pytest.fixture(scope="module")
 def prediction_df():
     """Create a DataFrame for testing prediction functionality."""
-    data = [
+    timestamps = pd.to_datetime([
         # Contact 1: Consistent quick responses
-        {'timestamp': datetime(2023, 1, 1, 10, 0), 'phone_number': '5551234567', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 10, 5), 'phone_number': '5551234567', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 1, 11, 0), 'phone_number': '5551234567', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 11, 4), 'phone_number': '5551234567', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 1, 12, 0), 'phone_number': '5551234567', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 12, 3), 'phone_number': '5551234567', 'message_type': 'received'},
+        '2023-01-01 10:00', '2023-01-01 10:05',
+        '2023-01-01 11:00', '2023-01-01 11:04',
+        '2023-01-01 12:00', '2023-01-01 12:03',
 
         # Contact 2: Consistent slow responses
-        {'timestamp': datetime(2023, 1, 1, 14, 0), 'phone_number': '5559876543', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 15, 0), 'phone_number': '5559876543', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 1, 16, 0), 'phone_number': '5559876543', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 17, 0), 'phone_number': '5559876543', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 1, 18, 0), 'phone_number': '5559876543', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 19, 0), 'phone_number': '5559876543', 'message_type': 'received'},
+        '2023-01-01 14:00', '2023-01-01 15:00',
+        '2023-01-01 16:00', '2023-01-01 17:00',
+        '2023-01-01 18:00', '2023-01-01 19:00',
 
         # Contact 3: Variable response times
-        {'timestamp': datetime(2023, 1, 2, 9, 0), 'phone_number': '5552223333', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 2, 9, 5), 'phone_number': '5552223333', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 2, 10, 0), 'phone_number': '5552223333', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 2, 11, 0), 'phone_number': '5552223333', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 2, 12, 0), 'phone_number': '5552223333', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 2, 12, 10), 'phone_number': '5552223333', 'message_type': 'received'},
-    ]
-
-    return pd.DataFrame(data)
+        '2023-01-02 09:00', '2023-01-02 09:05',
+        '2023-01-02 10:00', '2023-01-02 11:00',
+        '2023-01-02 12:00', '2023-01-02 12:10',
+    ])
+    phone_numbers = np.repeat(np.array(['5551234567', '5559876543', '5552223333'], dtype=object), 6)
+    message_types = np.tile(np.array(['sent', 'received'], dtype=object), 9)
+
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'phone_number': pd.Categorical(phone_numbers),
+        'message_type': pd.Categorical(message_types)
+    })
 
 
-@pytest.fixture
-def prediction_with_history_df():
-    """Create a DataFrame with extensive history for prediction testing."""
+def _build_prediction_with_history_df():
+    """Build the 30-day, three-contact history frame sorted by timestamp."""
     data = []
 
     # Contact 1: Consistent quick responses over 30 days
@@ -78,75 +74,129 @@ def prediction_with_history_df():
             {'timestamp': datetime(2023, 1, day, 12, response_time), 'phone_number': '5552223333', 'message_type': 'received'},
         ])
 
-    return pd.DataFrame(data)
+    df = pd.DataFrame(data).sort_values('timestamp', kind='stable', ignore_index=True)
+    df['phone_number'] = df['phone_number'].astype('category')
+    df['message_type'] = df['message_type'].astype('category')
+    return df
 
 
-@pytest.fixture
-def mock_ml_service_for_prediction():
-    """Create a mock ML model service for prediction testing."""
-    mock_service = MagicMock(spec=MLModelService)
-
-    # Mock the extract_features method
-    mock_service.extract_features.return_value = {
-        'response_times': [300, 300, 1800, 3600, 2700, 180],
-        'message_counts': {'5551234567': 6, '5559876543': 6, '5552223333': 6},
-        'sent_received_ratios': {'5551234567': 1.0, '5559876543': 1.0, '5552223333': 1.0},
-        'time_of_day_features': [0.5, 0.2, 0.3],
-        'day_of_week_features': [0.1, 0.2, 0.1, 0.2, 0.2, 0.1, 0.1]
-    }
-
-    # Mock the predict method
-    def mock_predict(model_name, features, **kwargs):
-        if model_name == "ResponseModel":
-            contact = kwargs.get('contact', '5551234567')
-
-            # Return different predictions based on contact
-            if contact == '5551234567':
-                return {
-                    'predictions': {
-                        'expected_response_time': 300,  # 5 minutes
-                        'response_probability': 0.95,
-                        'confidence': 0.9,
-                        'factors': ['consistent_history', 'time_of_day', 'message_content']
-                    },
-                    'model_name': 'ResponseModel',
-                    'model_version': '1.0'
-                }
-            elif contact == '5559876543':
-                return {
-                    'predictions': {
-                        'expected_response_time': 3600,  # 1 hour
-                        'response_probability': 0.8,
-                        'confidence': 0.75,
-                        'factors': ['consistent_history', 'time_of_day']
-                    },
-                    'model_name': 'ResponseModel',
-                    'model_version': '1.0'
-                }
-            else:
-                return {
-                    'predictions': {
-                        'expected_response_time': 1800,  # 30 minutes
-                        'response_probability': 0.6,
-                        'confidence': 0.5,
-                        'factors': ['variable_history']
-                    },
-                    'model_name': 'ResponseModel',
-                    'model_version': '1.0'
-                }
-        else:
+@pytest.fixture(scope="module")
+def prediction_with_history_df():
+    """Create a DataFrame with extensive history for prediction testing."""
+    return load_cached_frame(_build_prediction_with_history_df)
+
+
+# Canned ResponseModel predictions returned by the stub ML service.
+# The analyzer only reads these, so they are shared rather than rebuilt per call.
+_RESP_FAST = {
+    'predictions': {
+        'expected_response_time': 300,  # 5 minutes
+        'response_probability': 0.95,
+        'confidence': 0.9,
+        'factors': ['consistent_history', 'time_of_day', 'message_content']
+    },
+    'model_name': 'ResponseModel',
+    'model_version': '1.0'
+}
+
+_RESP_SLOW = {
+    'predictions': {
+        'expected_response_time': 3600,  # 1 hour
+        'response_probability': 0.8,
+        'confidence': 0.75,
+        'factors': ['consistent_history', 'time_of_day']
+    },
+    'model_name': 'ResponseModel',
+    'model_version': '1.0'
+}
+
+_RESP_VARIABLE = {
+    'predictions': {
+        'expected_response_time': 1800,  # 30 minutes
+        'response_probability': 0.6,
+        'confidence': 0.5,
+        'factors': ['variable_history']
+    },
+    'model_name': 'ResponseModel',
+    'model_version': '1.0'
+}
+
+_CONTACT_PREDICTIONS = {
+    '5551234567': _RESP_FAST,
+    '5559876543': _RESP_SLOW,
+}
+
+
+class _FakeMLService:
+    """Lightweight stand-in for MLModelService that records its calls."""
+
+    def __init__(self):
+        self.extract_features_calls = 0
+        self.predict_calls = []
+
+    def extract_features(self, df, column_mapping=None):
+        self.extract_features_calls += 1
+        return {
+            'response_times': [300, 300, 1800, 3600, 2700, 180],
+            'message_counts': {'5551234567': 6, '5559876543': 6, '5552223333': 6},
+            'sent_received_ratios': {'5551234567': 1.0, '5559876543': 1.0, '5552223333': 1.0},
+            'time_of_day_features': [0.5, 0.2, 0.3],
+            'day_of_week_features': [0.1, 0.2, 0.1, 0.2, 0.2, 0.1, 0.1]
+        }
+
+    def predict(self, model_name, features, **kwargs):
+        self.predict_calls.append((model_name, kwargs))
+
+        if model_name != "ResponseModel":
             return {'predictions': {}, 'model_name': model_name, 'model_version': '1.0'}
 
-    mock_service.predict = MagicMock(side_effect=mock_predict)
+        # Return different predictions based on contact
+        return _CONTACT_PREDICTIONS.get(kwargs.get('contact', '5551234567'), _RESP_VARIABLE)
 
-    return mock_service
+
+def _raise_ml_error(*args, **kwargs):
+    raise MLError("Test ML error")
+
+
+@pytest.fixture(scope="module")
+def predict(analyzer):
+    """Return a memoized statistical predict_response_behavior shared across the module.
+
+    Results are keyed on the identity of the (module-scoped) DataFrame and the
+    contact; the frame is kept alongside the result so its id cannot be reused.
+    """
+    cache = {}
+
+    def _predict(df, contact):
+        key = (id(df), contact)
+        if key not in cache:
+            cache[key] = (df, analyzer.predict_response_behavior(df, contact))
+        return cache[key][1]
+
+    return _predict
+
+
+@pytest.fixture(scope="module")
+def shared_ml_service():
+    """Create a stub ML model service shared by tests that do not modify it."""
+    return _FakeMLService()
+
+
+@pytest.fixture
+def mock_ml_service_for_prediction():
+    """Create a fresh stub ML model service for tests that modify it or count its calls."""
+    return _FakeMLService()
 
 
 @pytest.mark.unit
-def test_predict_response_behavior_basic(prediction_df):
+@pytest.mark.parametrize("contact,max_rt,min_rt,min_prob", [
+    ('5551234567', 300, None, 0.8),  # Quick responses: 5 minutes or less, high probability
+    ('5559876543', None, 3600, None),  # Slow responses: 1 hour or more
+    ('5552223333', None, None, None),  # Variable responses: structure only
+])
+def test_predict_response_behavior_basic(predict, prediction_df, contact, max_rt, min_rt, min_prob):
     """Test basic prediction functionality without ML model service."""
-    analyzer = ResponseAnalyzer()
-    result = analyzer.predict_response_behavior(prediction_df, '5551234567')
+    result = predict(prediction_df, contact)
 
     # Check that the result has the expected structure
     assert isinstance(result, dict)
@@ -154,13 +204,13 @@ def test_predict_response_behavior_basic(prediction_df):
     assert 'response_probability' in result
     assert 'confidence' in result
 
-    # Check specific values for contact with quick responses
-    assert result['expected_response_time'] <= 300  # 5 minutes or less
-    assert result['response_probability'] >= 0.8  # High probability
-
-    # Test with slow response contact
-    result = analyzer.predict_response_behavior(prediction_df, '5559876543')
-    assert result['expected_response_time'] >= 3600  # 1 hour or more
+    # Check specific values for the contact
+    if max_rt is not None:
+        assert result['expected_response_time'] <= max_rt
+    if min_rt is not None:
+        assert result['expected_response_time'] >= min_rt
+    if min_prob is not None:
+        assert result['response_probability'] >= min_prob
 
 
 @pytest.mark.unit
@@ -173,8 +223,8 @@ def test_predict_response_behavior_with_ml_service(prediction_df, mock_ml_servic
     result = analyzer.predict_response_behavior(prediction_df, '5551234567')
 
     # Check that the ML service was called
-    mock_ml_service_for_prediction.extract_features.assert_called()
-    mock_ml_service_for_prediction.predict.assert_called()
+    assert mock_ml_service_for_prediction.extract_features_calls > 0
+    assert len(mock_ml_service_for_prediction.predict_calls) > 0
 
     # Check that the result has the expected structure
     assert isinstance(result, dict)
@@ -193,12 +243,12 @@ def test_predict_response_behavior_with_ml_service(prediction_df, mock_ml_servic
 
 
 @pytest.mark.unit
-def test_predict_response_behavior_with_history(prediction_with_history_df):
+@pytest.mark.xdist_group("prediction_history")
+def test_predict_response_behavior_with_history(predict, prediction_with_history_df):
     """Test prediction with extensive history."""
-    analyzer = ResponseAnalyzer()
 
     # Test with contact that has consistent quick responses
-    result = analyzer.predict_response_behavior(prediction_with_history_df, '5551234567')
+    result = predict(prediction_with_history_df, '5551234567')
 
     # Check that the result has the expected structure
     assert isinstance(result, dict)
@@ -211,44 +261,60 @@ def test_predict_response_behavior_with_history(prediction_with_history_df):
     assert result['confidence'] >= 0.8  # High confidence due to consistent history
 
     # Test with contact that has gradually slowing responses
-    result = analyzer.predict_response_behavior(prediction_with_history_df, '5559876543')
+    result = predict(prediction_with_history_df, '5559876543')
 
     # Check that the prediction reflects the trend
     assert result['expected_response_time'] > 300  # Should be more than 5 minutes
     assert 'trend' in result  # Should detect the slowing trend
 
     # Test with contact that has day-of-week pattern
-    result = analyzer.predict_response_behavior(prediction_with_history_df, '5552223333')
+    result = predict(prediction_with_history_df, '5552223333')
 
     # Check that the prediction includes day-of-week factor
     assert 'day_of_week_factor' in result
 
 
+@pytest.mark.slow
+@pytest.mark.performance
+@pytest.mark.skipif(importlib.util.find_spec('pytest_benchmark') is None, reason="pytest-benchmark not installed")
+def test_predict_response_behavior_performance(analyzer, prediction_with_history_df, benchmark):
+    """Benchmark predict_response_behavior on the history frame.
+
+    Compare saved runs with --benchmark-compare-fail=median:20% to catch regressions.
+    """
+    result = benchmark.pedantic(analyzer.predict_response_behavior,
+                                args=(prediction_with_history_df, '5551234567'),
+                                rounds=20, iterations=3)
+
+    assert isinstance(result, dict)
+
+
 @pytest.mark.unit
-def test_prediction_confidence(prediction_df, prediction_with_history_df):
+@pytest.mark.xdist_group("prediction_history")
+def test_prediction_confidence(predict, prediction_df, prediction_with_history_df):
     """Test confidence score calculation."""
-    analyzer = ResponseAnalyzer()
 
     # Test with limited history
-    result_limited = analyzer.predict_response_behavior(prediction_df, '5551234567')
+    result_limited = predict(prediction_df, '5551234567')
 
     # Test with extensive history
-    result_extensive = analyzer.predict_response_behavior(prediction_with_history_df, '5551234567')
+    result_extensive = predict(prediction_with_history_df, '5551234567')
 
     # Confidence should be higher with more history
     assert result_extensive['confidence'] > result_limited['confidence']
 
     # Test with variable response times
-    result_variable = analyzer.predict_response_behavior(prediction_df, '5552223333')
+    result_variable = predict(prediction_df, '5552223333')
 
     # Confidence should be lower with variable response times
     assert result_variable['confidence'] < result_limited['confidence']
 
 
 @pytest.mark.unit
-def test_prediction_factors(prediction_with_history_df, mock_ml_service_for_prediction):
+@pytest.mark.xdist_group("prediction_history")
+def test_prediction_factors(predict, prediction_with_history_df, shared_ml_service):
     """Test identification of factors influencing prediction."""
-    analyzer = ResponseAnalyzer(ml_model_service=mock_ml_service_for_prediction)
+    analyzer = ResponseAnalyzer(ml_model_service=shared_ml_service)
 
     # Test with ML service
     result = analyzer.predict_response_behavior(prediction_with_history_df, '5551234567')
@@ -258,8 +324,7 @@ def test_prediction_factors(prediction_with_history_df, mock_ml_service_for_pred
     assert len(result['factors']) >= 1
 
     # Test without ML service
-    analyzer = ResponseAnalyzer()
-    result = analyzer.predict_response_behavior(prediction_with_history_df, '5552223333')
+    result = predict(prediction_with_history_df, '5552223333')
 
     # Check that basic factors are still identified
     assert 'factors' in result
@@ -267,30 +332,26 @@ def test_prediction_factors(prediction_with_history_df, mock_ml_service_for_pred
 
 
 @pytest.mark.unit
-def test_ml_model_integration(prediction_df, mock_ml_service_for_prediction):
+@pytest.mark.parametrize("contact", ['5551234567', '5559876543', '5552223333'])
+def test_ml_model_integration(prediction_df, shared_ml_service, contact):
     """Test integration with ML models."""
-    analyzer = ResponseAnalyzer(ml_model_service=mock_ml_service_for_prediction)
-
-    # Test with different contacts
-    contacts = ['5551234567', '5559876543', '5552223333']
+    analyzer = ResponseAnalyzer(ml_model_service=shared_ml_service)
+    result = analyzer.predict_response_behavior(prediction_df, contact)
 
-    for contact in contacts:
-        result = analyzer.predict_response_behavior(prediction_df, contact)
+    # Check that the ML service was called with the right parameters
+    assert shared_ml_service.predict_calls[-1] == ('ResponseModel', {'contact': contact})
 
-        # Check that the ML service was called with the right parameters
-        mock_ml_service_for_prediction.predict.assert_called()
-
-        # Check that the result includes ML-specific fields
-        assert 'model_name' in result
-        assert 'model_version' in result
-        assert result['model_name'] == 'ResponseModel'
+    # Check that the result includes ML-specific fields
+    assert 'model_name' in result
+    assert 'model_version' in result
+    assert result['model_name'] == 'ResponseModel'
 
 
 @pytest.mark.unit
 def test_ml_error_handling(prediction_df, mock_ml_service_for_prediction):
     """Test handling of ML service errors."""
     # Configure the mock to raise an error
-    mock_ml_service_for_prediction.predict.side_effect = MLError("Test ML error")
+    mock_ml_service_for_prediction.predict = _raise_ml_error
 
     analyzer = ResponseAnalyzer()
     analyzer.ml_model_service = mock_ml_service_for_prediction
@@ -313,10 +374,9 @@ def test_ml_error_handling(prediction_df, mock_ml_service_for_prediction):
 
 
 @pytest.mark.unit
-def test_unknown_contact(prediction_df):
+def test_unknown_contact(predict, prediction_df):
     """Test prediction for an unknown contact."""
-    analyzer = ResponseAnalyzer()
-    result = analyzer.predict_response_behavior(prediction_df, '5550000000')  # Unknown contact
+    result = predict(prediction_df, '5550000000')  # Unknown contact
 
     # Check that the result has the expected structure
     assert isinstance(result, dict)
@@ -360,22 +420,17 @@ def test_column_mapping_prediction(prediction_df):
 
 
 @pytest.mark.unit
-def test_error_handling_prediction():
-    """Test error handling in prediction."""
-    analyzer = ResponseAnalyzer()
-
-    # Test with empty DataFrame
-    empty_df = pd.DataFrame()
-    result = analyzer.predict_response_behavior(empty_df, '5551234567')
-    assert 'error' in result
-    assert analyzer.last_error is not None
-
-    # Test with missing columns
-    df_missing_column = pd.DataFrame({
+@pytest.mark.parametrize("bad_df", [
+    pd.DataFrame(),
+    pd.DataFrame({
         'timestamp': [datetime(2023, 1, 1, 10, 0)],
         'phone_number': ['5551234567']
-    })
+    }),
+], ids=['empty', 'missing_column'])
+def test_error_handling_prediction(bad_df):
+    """Test error handling in prediction."""
+    analyzer = ResponseAnalyzer()
+    result = analyzer.predict_response_behavior(bad_df, '5551234567')
 
-    result = analyzer.predict_response_behavior(df_missing_column, '5551234567')
     assert 'error' in result
     assert analyzer.last_error is not None
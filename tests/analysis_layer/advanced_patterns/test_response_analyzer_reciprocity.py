@@ -4,239 +4,201 @@ Tests for the reciprocity pattern detection functionality of the ResponseAnalyze
 This module contains tests for the detect_reciprocity_patterns method of the ResponseAnalyzer.
 """
 
+import importlib.util
+
 import pytest
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from unittest.mock import MagicMock, patch
 
 from src.analysis_layer.advanced_patterns.response_analyzer import ResponseAnalyzer
+from tests.utils.fixture_cache import load_cached_frame
+
+pytestmark = pytest.mark.unit
+
+MESSAGE_TYPES = ['sent', 'received']
+
+
+def _make_frame(timestamps, phone_numbers, message_types):
+    """Assemble a phone-records frame from column arrays with categorical contact/type columns."""
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'phone_number': pd.Categorical(phone_numbers),
+        'message_type': pd.Categorical(message_types, categories=MESSAGE_TYPES)
+    })
+
+
+def _expected_ratios(df):
+    """Compute each contact's exact sent:received ratio straight from the frame's arrays."""
+    phones, inverse = np.unique(df['phone_number'].to_numpy(), return_inverse=True)
+    sent = np.bincount(inverse, weights=df['message_type'].to_numpy() == 'sent')
+    received = np.bincount(inverse) - sent
+    # A contact the user only sent messages to has an infinite ratio, as in the analyzer
+    ratios = np.divide(sent, received, out=np.full(len(phones), np.inf), where=received > 0)
+    return dict(zip(phones, ratios))
+
+
+# The DataFrame fixtures below are shared across tests: detect_reciprocity_patterns
+# sorts into a copy and never modifies the frame it is given.
+
 
+@pytest.fixture(scope="module")
+def detect(analyzer):
+    """Return a memoized detect_reciprocity_patterns for the module-scoped frames.
 
-@pytest.fixture
+    Results are keyed on the frame's identity; the frame is kept alongside the
+    result so its id cannot be reused while the cache is alive.
+    """
+    cache = {}
+
+    def _detect(df):
+        key = id(df)
+        if key not in cache:
+            cache[key] = (df, analyzer.detect_reciprocity_patterns(df))
+        return cache[key][1]
+
+    return _detect
+
+
+@pytest.fixture(scope="module")
 def balanced_communication_df():
     """Create a DataFrame with balanced communication patterns."""
-    data = [
+    timestamps = np.array([
         # Contact 1: Balanced (1:1 ratio)
-        {'timestamp': datetime(2023, 1, 1, 10, 0), 'phone_number': '5551234567', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 10, 5), 'phone_number': '5551234567', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 1, 10, 10), 'phone_number': '5551234567', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 10, 15), 'phone_number': '5551234567', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 1, 10, 20), 'phone_number': '5551234567', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 10, 25), 'phone_number': '5551234567', 'message_type': 'received'},
-        
+        '2023-01-01 10:00', '2023-01-01 10:05', '2023-01-01 10:10',
+        '2023-01-01 10:15', '2023-01-01 10:20', '2023-01-01 10:25',
+
         # Contact 2: Also balanced (1:1 ratio)
-        {'timestamp': datetime(2023, 1, 1, 14, 0), 'phone_number': '5559876543', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 1, 14, 5), 'phone_number': '5559876543', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 14, 10), 'phone_number': '5559876543', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 1, 14, 15), 'phone_number': '5559876543', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 14, 20), 'phone_number': '5559876543', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 1, 14, 25), 'phone_number': '5559876543', 'message_type': 'sent'},
-    ]
-    
-    return pd.DataFrame(data)
+        '2023-01-01 14:00', '2023-01-01 14:05', '2023-01-01 14:10',
+        '2023-01-01 14:15', '2023-01-01 14:20', '2023-01-01 14:25',
+    ], dtype='datetime64[ns]')
+    phone_numbers = np.repeat(np.array(['5551234567', '5559876543'], dtype=object), 6)
+    message_types = np.concatenate([
+        np.tile(np.array(['sent', 'received'], dtype=object), 3),
+        np.tile(np.array(['received', 'sent'], dtype=object), 3),
+    ])
+
+    return _make_frame(timestamps, phone_numbers, message_types)
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def unbalanced_communication_df():
     """Create a DataFrame with unbalanced communication patterns."""
-    data = [
-        # Contact 1: User sends more (3:1 ratio)
-        {'timestamp': datetime(2023, 1, 1, 10, 0), 'phone_number': '5551234567', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 10, 5), 'phone_number': '5551234567', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 10, 10), 'phone_number': '5551234567', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 10, 15), 'phone_number': '5551234567', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 1, 10, 20), 'phone_number': '5551234567', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 10, 25), 'phone_number': '5551234567', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 10, 30), 'phone_number': '5551234567', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 10, 35), 'phone_number': '5551234567', 'message_type': 'received'},
-        
-        # Contact 2: User receives more (1:3 ratio)
-        {'timestamp': datetime(2023, 1, 1, 14, 0), 'phone_number': '5559876543', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 1, 14, 5), 'phone_number': '5559876543', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 1, 14, 10), 'phone_number': '5559876543', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 1, 14, 15), 'phone_number': '5559876543', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 14, 20), 'phone_number': '5559876543', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 1, 14, 25), 'phone_number': '5559876543', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 1, 14, 30), 'phone_number': '5559876543', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 1, 14, 35), 'phone_number': '5559876543', 'message_type': 'sent'},
-    ]
-    
-    return pd.DataFrame(data)
+    # Eight messages per contact, 5 minutes apart, starting at 10:00 and 14:00
+    minutes = (np.arange(8) * 5).astype('timedelta64[m]')
+    timestamps = np.concatenate([
+        np.datetime64('2023-01-01T10:00', 'ns') + minutes,
+        np.datetime64('2023-01-01T14:00', 'ns') + minutes,
+    ])
+    phone_numbers = np.repeat(np.array(['5551234567', '5559876543'], dtype=object), 8)
+    message_types = np.concatenate([
+        np.tile(np.repeat(np.array(['sent', 'received'], dtype=object), [3, 1]), 2),  # Contact 1: User sends more (3:1)
+        np.tile(np.repeat(np.array(['received', 'sent'], dtype=object), [3, 1]), 2),  # Contact 2: User receives more (1:3)
+    ])
 
+    return _make_frame(timestamps, phone_numbers, message_types)
 
-@pytest.fixture
+
+@pytest.fixture(scope="module")
 def mixed_communication_df():
     """Create a DataFrame with mixed communication patterns."""
-    data = [
+    timestamps = np.array([
         # Contact 1: Balanced (1:1 ratio)
-        {'timestamp': datetime(2023, 1, 1, 10, 0), 'phone_number': '5551234567', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 10, 5), 'phone_number': '5551234567', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 1, 10, 10), 'phone_number': '5551234567', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 10, 15), 'phone_number': '5551234567', 'message_type': 'received'},
-        
+        '2023-01-01 10:00', '2023-01-01 10:05', '2023-01-01 10:10', '2023-01-01 10:15',
+
         # Contact 2: User sends more (2:1 ratio)
-        {'timestamp': datetime(2023, 1, 1, 14, 0), 'phone_number': '5559876543', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 14, 5), 'phone_number': '5559876543', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 14, 10), 'phone_number': '5559876543', 'message_type': 'received'},
-        
+        '2023-01-01 14:00', '2023-01-01 14:05', '2023-01-01 14:10',
+
         # Contact 3: User receives more (1:2 ratio)
-        {'timestamp': datetime(2023, 1, 2, 9, 0), 'phone_number': '5552223333', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 2, 9, 5), 'phone_number': '5552223333', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 2, 9, 10), 'phone_number': '5552223333', 'message_type': 'sent'},
-    ]
-    
-    return pd.DataFrame(data)
+        '2023-01-02 09:00', '2023-01-02 09:05', '2023-01-02 09:10',
+    ], dtype='datetime64[ns]')
+    phone_numbers = np.repeat(np.array(['5551234567', '5559876543', '5552223333'], dtype=object), [4, 3, 3])
+    message_types = np.array([
+        'sent', 'received', 'sent', 'received',
+        'sent', 'sent', 'received',
+        'received', 'received', 'sent',
+    ], dtype=object)
 
+    return _make_frame(timestamps, phone_numbers, message_types)
 
-@pytest.fixture
+
+@pytest.fixture(scope="module")
 def initiation_pattern_df():
     """Create a DataFrame with clear conversation initiation patterns."""
-    data = [
-        # Conversation 1: Contact 1 initiates
-        {'timestamp': datetime(2023, 1, 1, 10, 0), 'phone_number': '5551234567', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 1, 10, 5), 'phone_number': '5551234567', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 10, 10), 'phone_number': '5551234567', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 1, 10, 15), 'phone_number': '5551234567', 'message_type': 'sent'},
-        
-        # Gap (2 hours)
-        
-        # Conversation 2: Contact 1 initiates again
-        {'timestamp': datetime(2023, 1, 1, 12, 0), 'phone_number': '5551234567', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 1, 12, 5), 'phone_number': '5551234567', 'message_type': 'sent'},
-        
-        # Gap (2 hours)
-        
-        # Conversation 3: User initiates with Contact 2
-        {'timestamp': datetime(2023, 1, 1, 14, 0), 'phone_number': '5559876543', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 14, 5), 'phone_number': '5559876543', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 1, 14, 10), 'phone_number': '5559876543', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 14, 15), 'phone_number': '5559876543', 'message_type': 'received'},
-        
-        # Gap (2 hours)
-        
-        # Conversation 4: User initiates with Contact 2 again
-        {'timestamp': datetime(2023, 1, 1, 16, 0), 'phone_number': '5559876543', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 16, 5), 'phone_number': '5559876543', 'message_type': 'received'},
+    # Minutes after 10:00; conversations are separated by 2-hour gaps
+    offsets = np.array([
+        0, 5, 10, 15,  # Conversation 1: Contact 1 initiates
+        120, 125,  # Conversation 2: Contact 1 initiates again
+        240, 245, 250, 255,  # Conversation 3: User initiates with Contact 2
+        360, 365,  # Conversation 4: User initiates with Contact 2 again
+    ]).astype('timedelta64[m]')
+    timestamps = np.datetime64('2023-01-01T10:00', 'ns') + offsets
+    phone_numbers = np.repeat(np.array(['5551234567', '5559876543'], dtype=object), 6)
+    message_types = np.concatenate([
+        np.tile(np.array(['received', 'sent'], dtype=object), 3),
+        np.tile(np.array(['sent', 'received'], dtype=object), 3),
+    ])
+
+    return _make_frame(timestamps, phone_numbers, message_types)
+
+
+def _build_reciprocity_over_time_df():
+    """Build three months of exchanges whose sent:received ratio changes each month."""
+    # Month start and the message pattern of each day's exchange
+    months = [
+        ('2023-01-01', ['sent', 'received']),  # Month 1: Balanced communication (1:1)
+        ('2023-02-01', ['sent', 'sent', 'received']),  # Month 2: User sends more (2:1)
+        ('2023-03-01', ['sent', 'received', 'received']),  # Month 3: User receives more (1:2)
     ]
-    
-    return pd.DataFrame(data)
+    days = np.arange(10).astype('timedelta64[D]')  # One exchange per day for 10 days, at 10:00
 
+    timestamps = np.concatenate([
+        (np.datetime64(start, 'ns') + np.timedelta64(10, 'h') + days[:, None]
+         + (np.arange(len(pattern)) * 5).astype('timedelta64[m]')).ravel()  # Messages 5 minutes apart
+        for start, pattern in months
+    ])
+    message_types = np.concatenate([np.tile(np.array(pattern, dtype=object), len(days)) for _, pattern in months])
+    phone_numbers = np.full(len(timestamps), '5551234567', dtype=object)
 
-@pytest.fixture
+    return _make_frame(timestamps, phone_numbers, message_types)
+
+
+@pytest.fixture(scope="session")
 def reciprocity_over_time_df():
     """Create a DataFrame with changing reciprocity patterns over time."""
-    data = []
-    
-    # Month 1: Balanced communication (1:1)
-    for day in range(1, 11):  # 10 days
-        data.extend([
-            {'timestamp': datetime(2023, 1, day, 10, 0), 'phone_number': '5551234567', 'message_type': 'sent'},
-            {'timestamp': datetime(2023, 1, day, 10, 5), 'phone_number': '5551234567', 'message_type': 'received'},
-        ])
-    
-    # Month 2: User sends more (2:1)
-    for day in range(1, 11):  # 10 days
-        data.extend([
-            {'timestamp': datetime(2023, 2, day, 10, 0), 'phone_number': '5551234567', 'message_type': 'sent'},
-            {'timestamp': datetime(2023, 2, day, 10, 5), 'phone_number': '5551234567', 'message_type': 'sent'},
-            {'timestamp': datetime(2023, 2, day, 10, 10), 'phone_number': '5551234567', 'message_type': 'received'},
-        ])
-    
-    # Month 3: User receives more (1:2)
-    for day in range(1, 11):  # 10 days
-        data.extend([
-            {'timestamp': datetime(2023, 3, day, 10, 0), 'phone_number': '5551234567', 'message_type': 'sent'},
-            {'timestamp': datetime(2023, 3, day, 10, 5), 'phone_number': '5551234567', 'message_type': 'received'},
-            {'timestamp': datetime(2023, 3, day, 10, 10), 'phone_number': '5551234567', 'message_type': 'received'},
-        ])
-    
-    return pd.DataFrame(data)
-
+    return load_cached_frame(_build_reciprocity_over_time_df)
 
-@pytest.mark.unit
-def test_detect_reciprocity_patterns_balanced(balanced_communication_df):
-    """Test reciprocity pattern detection with balanced communication."""
-    analyzer = ResponseAnalyzer()
-    result = analyzer.detect_reciprocity_patterns(balanced_communication_df)
-    
-    # Check that the result has the expected structure
-    assert isinstance(result, dict)
-    assert 'message_ratios' in result
-    assert 'balanced_contacts' in result
-    assert 'unbalanced_contacts' in result
-    
-    # Check specific values
-    assert '5551234567' in result['message_ratios']
-    assert '5559876543' in result['message_ratios']
-    
-    # Check that both contacts are balanced
-    assert '5551234567' in result['balanced_contacts']
-    assert '5559876543' in result['balanced_contacts']
-    assert len(result['unbalanced_contacts']) == 0
-    
-    # Check that ratios are close to 1.0
-    assert 0.8 <= result['message_ratios']['5551234567'] <= 1.2
-    assert 0.8 <= result['message_ratios']['5559876543'] <= 1.2
 
+@pytest.mark.parametrize("df_fixture,expected_balanced,expected_unbalanced", [
+    # Both contacts balanced (1:1)
+    ('balanced_communication_df', {'5551234567', '5559876543'}, set()),
+    # User sends more (3:1) and user receives more (1:3)
+    ('unbalanced_communication_df', set(), {'5551234567', '5559876543'}),
+    # Balanced (1:1), user sends more (2:1), user receives more (1:2)
+    ('mixed_communication_df', {'5551234567'}, {'5559876543', '5552223333'}),
+], ids=['balanced', 'unbalanced', 'mixed'])
+def test_message_ratio_classification(request, detect, df_fixture, expected_balanced, expected_unbalanced):
+    """Test message ratio calculation and balanced/unbalanced classification."""
+    df = request.getfixturevalue(df_fixture)
+    result = detect(df)
+    expected_ratios = _expected_ratios(df)
 
-@pytest.mark.unit
-def test_detect_reciprocity_patterns_unbalanced(unbalanced_communication_df):
-    """Test reciprocity pattern detection with unbalanced communication."""
-    analyzer = ResponseAnalyzer()
-    result = analyzer.detect_reciprocity_patterns(unbalanced_communication_df)
-    
     # Check that the result has the expected structure
     assert isinstance(result, dict)
-    assert 'message_ratios' in result
-    assert 'balanced_contacts' in result
-    assert 'unbalanced_contacts' in result
-    
-    # Check specific values
-    assert '5551234567' in result['message_ratios']
-    assert '5559876543' in result['message_ratios']
-    
-    # Check that both contacts are unbalanced
-    assert '5551234567' in result['unbalanced_contacts']
-    assert '5559876543' in result['unbalanced_contacts']
-    assert len(result['balanced_contacts']) == 0
-    
-    # Check that ratios reflect the expected imbalance
-    assert result['message_ratios']['5551234567'] > 2.0  # User sends more
-    assert result['message_ratios']['5559876543'] < 0.5  # User receives more
+    assert result.keys() >= {'message_ratios', 'balanced_contacts', 'unbalanced_contacts'}
 
-
-@pytest.mark.unit
-def test_message_ratio_calculation(mixed_communication_df):
-    """Test message ratio calculation."""
-    analyzer = ResponseAnalyzer()
-    result = analyzer.detect_reciprocity_patterns(mixed_communication_df)
-    
-    # Check that the result has the expected structure
-    assert isinstance(result, dict)
-    assert 'message_ratios' in result
-    
-    # Check specific values
-    assert '5551234567' in result['message_ratios']
-    assert '5559876543' in result['message_ratios']
-    assert '5552223333' in result['message_ratios']
-    
     # Check that ratios match expected values
-    assert 0.8 <= result['message_ratios']['5551234567'] <= 1.2  # Balanced (1:1)
-    assert 1.8 <= result['message_ratios']['5559876543'] <= 2.2  # User sends more (2:1)
-    assert 0.4 <= result['message_ratios']['5552223333'] <= 0.6  # User receives more (1:2)
-    
+    assert set(result['message_ratios']) >= expected_ratios.keys()
+    for contact, expected_ratio in expected_ratios.items():
+        assert result['message_ratios'][contact] == pytest.approx(expected_ratio)
+
     # Check classification
-    assert '5551234567' in result['balanced_contacts']
-    assert '5559876543' in result['unbalanced_contacts']
-    assert '5552223333' in result['unbalanced_contacts']
+    assert set(result['balanced_contacts']) == expected_balanced
+    assert set(result['unbalanced_contacts']) == expected_unbalanced
 
 
-@pytest.mark.unit
-def test_initiation_pattern_detection(initiation_pattern_df):
+def test_initiation_pattern_detection(detect, initiation_pattern_df):
     """Test detection of conversation initiation patterns."""
-    analyzer = ResponseAnalyzer()
-    result = analyzer.detect_reciprocity_patterns(initiation_pattern_df)
+    result = detect(initiation_pattern_df)
     
     # Check that the result has the expected structure
     assert isinstance(result, dict)
@@ -244,39 +206,37 @@ def test_initiation_pattern_detection(initiation_pattern_df):
     
     # Check initiation patterns
     initiation = result['initiation_patterns']
-    assert 'contact_initiated' in initiation
-    assert 'user_initiated' in initiation
+    assert initiation.keys() >= {'contact_initiated', 'user_initiated', 'total_conversations',
+                                 'contact_initiated_percent', 'user_initiated_percent'}
     
     # Check specific values
-    assert '5551234567' in initiation['contact_initiated']
+    assert set(initiation['contact_initiated']) >= {'5551234567'}
     assert initiation['contact_initiated']['5551234567'] == 2
     
-    assert '5559876543' in initiation['user_initiated']
+    assert set(initiation['user_initiated']) >= {'5559876543'}
     assert initiation['user_initiated']['5559876543'] == 2
     
     # Check overall stats
-    assert 'total_conversations' in initiation
-    assert 'contact_initiated_percent' in initiation
-    assert 'user_initiated_percent' in initiation
-    
     assert initiation['total_conversations'] == 4
-    assert initiation['contact_initiated_percent'] == 50.0
-    assert initiation['user_initiated_percent'] == 50.0
+    # Each side initiated half the conversations; the percentages are computed
+    # floats, so they are checked with a tolerance rather than exact equality
+    assert 2 * sum(initiation['contact_initiated'].values()) == initiation['total_conversations']
+    assert 2 * sum(initiation['user_initiated'].values()) == initiation['total_conversations']
+    assert initiation['contact_initiated_percent'] == pytest.approx(50.0, abs=1e-9)
+    assert initiation['user_initiated_percent'] == pytest.approx(50.0, abs=1e-9)
 
 
-@pytest.mark.unit
-def test_reciprocity_over_time(reciprocity_over_time_df):
+def test_reciprocity_over_time(detect, reciprocity_over_time_df):
     """Test detection of changes in reciprocity over time."""
-    analyzer = ResponseAnalyzer()
-    result = analyzer.detect_reciprocity_patterns(reciprocity_over_time_df)
+    result = detect(reciprocity_over_time_df)
     
     # Check that the result has the expected structure
     assert isinstance(result, dict)
-    assert 'reciprocity_over_time' in result
+    assert result.keys() >= {'reciprocity_over_time', 'trend_detected'}
     
     # Check time-based analysis
     time_analysis = result['reciprocity_over_time']
-    assert '5551234567' in time_analysis
+    assert set(time_analysis) >= {'5551234567'}
     
     # Check that we have data for each month
     contact_data = time_analysis['5551234567']
@@ -286,49 +246,66 @@ def test_reciprocity_over_time(reciprocity_over_time_df):
     # Month 1: Balanced (ratio ≈ 1.0)
     # Month 2: User sends more (ratio > 1.0)
     # Month 3: User receives more (ratio < 1.0)
-    assert 0.8 <= contact_data[0]['ratio'] <= 1.2
+    assert contact_data[0]['ratio'] == pytest.approx(1.0, rel=0.2)
     assert contact_data[1]['ratio'] > 1.5
     assert contact_data[2]['ratio'] < 0.7
     
     # Check that we detect the trend
-    assert 'trend_detected' in result
     assert result['trend_detected'] is True
 
 
-@pytest.mark.unit
-def test_column_mapping_reciprocity():
+@pytest.fixture(scope="module")
+def large_reciprocity_df():
+    """Create a 100k-row frame with five contacts for benchmarking."""
+    n_rows = 100_000
+    rng = np.random.default_rng(42)
+    contacts = np.array(['A', 'B', 'C', 'D', 'E'], dtype=object)
+
+    return _make_frame(np.datetime64('2023-01-01', 'ns') + np.arange(n_rows).astype('timedelta64[s]'),
+                       rng.choice(contacts, n_rows),
+                       rng.choice(np.array(MESSAGE_TYPES, dtype=object), n_rows))
+
+
+@pytest.mark.slow
+@pytest.mark.performance
+@pytest.mark.skipif(importlib.util.find_spec('pytest_benchmark') is None, reason="pytest-benchmark not installed")
+def test_reciprocity_performance(analyzer, large_reciprocity_df, benchmark):
+    """Benchmark detect_reciprocity_patterns on a large synthetic frame."""
+    result = benchmark(analyzer.detect_reciprocity_patterns, large_reciprocity_df)
+
+    assert set(result['message_ratios']) == {'A', 'B', 'C', 'D', 'E'}
+
+
+def test_column_mapping_reciprocity(analyzer, balanced_communication_df):
     """Test that column mapping works correctly for reciprocity pattern detection."""
-    # Create a DataFrame with renamed columns
-    data = [
-        {'time': datetime(2023, 1, 1, 10, 0), 'contact': '5551234567', 'direction': 'sent'},
-        {'time': datetime(2023, 1, 1, 10, 5), 'contact': '5551234567', 'direction': 'received'},
-        {'time': datetime(2023, 1, 1, 10, 10), 'contact': '5551234567', 'direction': 'sent'},
-        {'time': datetime(2023, 1, 1, 10, 15), 'contact': '5551234567', 'direction': 'received'},
-    ]
-    
-    df = pd.DataFrame(data)
-    
+    # Relabel the balanced frame's columns without copying its data
+    df = balanced_communication_df.set_axis(['time', 'contact', 'direction'], axis=1, copy=False)
+
     # Create column mapping
     column_mapping = {
         'timestamp': 'time',
         'phone_number': 'contact',
         'message_type': 'direction'
     }
-    
-    analyzer = ResponseAnalyzer()
+
+    snapshot = df.copy()
+
     result = analyzer.detect_reciprocity_patterns(df, column_mapping=column_mapping)
-    
+
+    # The mapping is resolved internally; the caller's frame is left as it was
+    assert list(df.columns) == ['time', 'contact', 'direction']
+    assert df.equals(snapshot)
+
     # Check that the analysis works with the mapping
     assert isinstance(result, dict)
-    assert 'message_ratios' in result
-    assert 'balanced_contacts' in result
-    assert '5551234567' in result['message_ratios']
-    assert '5551234567' in result['balanced_contacts']
+    assert result.keys() >= {'message_ratios', 'balanced_contacts'}
+    assert set(result['message_ratios']) >= {'5551234567'}
+    assert set(result['balanced_contacts']) >= {'5551234567'}
 
 
-@pytest.mark.unit
 def test_error_handling_reciprocity():
     """Test error handling in reciprocity pattern detection."""
+    # Use a fresh analyzer so last_error is not left over from other tests
     analyzer = ResponseAnalyzer()
     
     # Test with empty DataFrame
@@ -340,7 +317,7 @@ def test_error_handling_reciprocity():
     
     # Test with missing columns
     df_missing_column = pd.DataFrame({
-        'timestamp': [datetime(2023, 1, 1, 10, 0)],
+        'timestamp': np.array(['2023-01-01T10:00'], dtype='datetime64[ns]'),
         'phone_number': ['5551234567']
     })
     
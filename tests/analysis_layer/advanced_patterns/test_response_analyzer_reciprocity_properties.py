@@ -0,0 +1,71 @@
+"""
+Property-based tests for the reciprocity pattern detection of the ResponseAnalyzer.
+
+This module generates sent/received message streams with hypothesis and checks that
+detect_reciprocity_patterns reports their ratio and balance correctly.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+
+pytest.importorskip("hypothesis")
+
+from hypothesis import Phase, example, given, settings, strategies as st
+
+pytestmark = pytest.mark.unit
+
+# Default balanced band for the user's share of sent messages (analysis.reciprocity.balance_low/high)
+BALANCE_LOW = 0.4
+BALANCE_HIGH = 0.6
+
+
+def _message_stream_df(n_sent, n_received, seed):
+    """Build one contact's shuffled stream of n_sent sent and n_received received messages."""
+    n_messages = n_sent + n_received
+    message_types = np.repeat(np.array(['sent', 'received'], dtype=object), [n_sent, n_received])
+    np.random.default_rng(seed).shuffle(message_types)
+
+    return pd.DataFrame({
+        'timestamp': np.datetime64('2023-01-01', 'ns') + (np.arange(n_messages) * 5).astype('timedelta64[m]'),
+        'phone_number': pd.Categorical(np.full(n_messages, '5551234567', dtype=object)),
+        'message_type': pd.Categorical(message_types, categories=['sent', 'received'])
+    })
+
+
+# Skip hypothesis' explain phase: it re-runs the analyzer many times to annotate a failure
+property_settings = settings(max_examples=25, deadline=None,
+                             phases=[Phase.explicit, Phase.reuse, Phase.generate, Phase.shrink])
+
+# A stream of one contact's messages; the seed fixes the interleaving order
+message_counts = dict(n_sent=st.integers(1, 100), n_received=st.integers(1, 100), seed=st.integers(0, 2**32 - 1))
+
+
+@property_settings
+@given(**message_counts)
+def test_message_ratio_property(analyzer, n_sent, n_received, seed):
+    """Test that the message ratio equals the generated sent:received counts."""
+    result = analyzer.detect_reciprocity_patterns(_message_stream_df(n_sent, n_received, seed))
+
+    assert result['message_ratios']['5551234567'] == pytest.approx(n_sent / n_received)
+
+
+@property_settings
+@given(**message_counts)
+@example(n_sent=2, n_received=3, seed=0)  # sent share exactly BALANCE_LOW
+@example(n_sent=3, n_received=2, seed=0)  # sent share exactly BALANCE_HIGH
+def test_balance_classification_property(analyzer, n_sent, n_received, seed):
+    """Test that a contact is balanced exactly when the user's share of messages is in the balanced band."""
+    result = analyzer.detect_reciprocity_patterns(_message_stream_df(n_sent, n_received, seed))
+
+    sent_ratio = n_sent / (n_sent + n_received)
+    if sent_ratio < BALANCE_LOW:
+        expected_balance = 'mostly_received'
+    elif sent_ratio > BALANCE_HIGH:
+        expected_balance = 'mostly_sent'
+    else:
+        expected_balance = 'balanced'
+
+    contact = result['contact_reciprocity']['5551234567']
+    assert (contact['sent_messages'], contact['received_messages']) == (n_sent, n_received)
+    assert contact['relationship_balance'] == expected_balance
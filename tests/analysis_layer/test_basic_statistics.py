@@ -6,19 +6,63 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 from unittest.mock import patch, MagicMock
+from src.analysis_layer.basic_statistics import BasicStatisticsAnalyzer
+from src.analysis_layer.analysis_models import (
+    DateRangeStats, ContactStats, DurationStats, TypeStats, BasicStatistics
+)
 
-@pytest.fixture
+# First and last dates in sample_dataframe
+_T_START = pd.Timestamp('2023-01-01')
+_T_END = pd.Timestamp('2023-02-28')
+
+# Canned distributions and frequencies returned by the mocked calculators, in call order
+_HOURLY = {'0': 1, '12': 4}
+_DAILY = {'Monday': 2, 'Friday': 3}
+_MONTHLY = {'January': 3, 'February': 2}
+
+_DAILY_FREQUENCY = 0.5
+_WEEKLY_FREQUENCY = 2.5
+_MONTHLY_FREQUENCY = 10.0
+
+class _RaisingColumn:
+    """Column stub whose sum() fails, so duration analysis raises."""
+
+    def min(self):
+        return None
+
+    def max(self):
+        return None
+
+    def sum(self):
+        raise Exception("Test exception")
+
+class _RaisingDataFrame:
+    """Non-empty DataFrame stub whose columns raise when summed."""
+
+    empty = False
+    columns = ['date', 'duration']
+
+    def __len__(self):
+        return 5
+
+    def __getitem__(self, column):
+        return _RaisingColumn()
+
+@pytest.fixture(scope="module")
 def sample_dataframe():
-    """Create a sample DataFrame for testing."""
+    """Create a sample DataFrame for testing.
+
+    The frame is shared by every test in the module and must not be modified.
+    """
     return pd.DataFrame({
-        'date': ['2023-01-01', '2023-01-15', '2023-01-31', '2023-02-15', '2023-02-28'],
+        'date': pd.to_datetime(['2023-01-01', '2023-01-15', '2023-01-31', '2023-02-15', '2023-02-28']),
         'number': ['1234567890', '1234567890', '9876543210', '5551234567', '9876543210'],
         'message_type': ['sent', 'received', 'sent', 'received', 'sent'],
         'message_content': ['Hello', 'Hi there', 'How are you?', 'Good, thanks!', 'Bye'],
         'duration': [10, 15, 5, 20, 8]
     })
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_column_mapping():
     """Create a sample column mapping for testing."""
     return {
@@ -29,20 +73,26 @@ def sample_column_mapping():
         'duration': 'duration'
     }
 
+@pytest.fixture(scope="module")
+def shared_analyzer():
+    """Create one BasicStatisticsAnalyzer for the whole module."""
+    return BasicStatisticsAnalyzer()
+
+@pytest.fixture
+def analyzer(shared_analyzer):
+    """Return the shared BasicStatisticsAnalyzer with last_error cleared."""
+    shared_analyzer.last_error = None
+    return shared_analyzer
+
 @pytest.mark.unit
 def test_basic_statistics_analyzer_initialization():
     """Test initializing the BasicStatisticsAnalyzer."""
-    from src.analysis_layer.basic_statistics import BasicStatisticsAnalyzer
-
     analyzer = BasicStatisticsAnalyzer()
     assert analyzer.last_error is None
 
 @pytest.mark.unit
-def test_analyze_empty_dataframe():
+def test_analyze_empty_dataframe(analyzer):
     """Test analyzing an empty DataFrame."""
-    from src.analysis_layer.basic_statistics import BasicStatisticsAnalyzer
-
-    analyzer = BasicStatisticsAnalyzer()
     empty_df = pd.DataFrame()
     column_mapping = {}
 
@@ -53,62 +103,32 @@ def test_analyze_empty_dataframe():
     assert analyzer.last_error == "Cannot analyze empty DataFrame"
 
 @pytest.mark.unit
-def test_analyze_with_exception():
+def test_analyze_with_exception(analyzer):
     """Test analyzing with an exception."""
-    from src.analysis_layer.basic_statistics import BasicStatisticsAnalyzer
-
-    analyzer = BasicStatisticsAnalyzer()
-
-    # Mock a DataFrame that raises an exception when accessed
-    mock_df = MagicMock()
-    # Make sure the DataFrame doesn't appear empty
-    mock_df.__len__.return_value = 5
-    mock_df.empty = False
-
-    # Mock the column mapping to ensure it passes the initial checks
+    # The column mapping must pass the initial checks against _RaisingDataFrame.columns
     column_mapping = {'date': 'date', 'duration': 'duration'}
-    mock_df.columns = ['date', 'duration']
-
-    # Make the exception happen during duration analysis
-    mock_df.__getitem__.return_value.sum.side_effect = Exception("Test exception")
 
     # Trigger the exception in the duration analysis
-    result, error = analyzer.analyze(mock_df, column_mapping)
+    result, error = analyzer.analyze(_RaisingDataFrame(), column_mapping)
 
     assert result is None
     assert "Error analyzing basic statistics: Test exception" in error
     assert "Error analyzing basic statistics: Test exception" in analyzer.last_error
 
 @pytest.mark.unit
-def test_analyze_date_range(sample_dataframe, sample_column_mapping):
+def test_analyze_date_range(analyzer, sample_dataframe, sample_column_mapping):
     """Test analyzing date range statistics."""
-    from src.analysis_layer.basic_statistics import BasicStatisticsAnalyzer
-    from src.analysis_layer.analysis_models import DateRangeStats
-
-    analyzer = BasicStatisticsAnalyzer()
-
-    # Convert date strings to datetime objects for comparison
-    sample_dataframe['date'] = pd.to_datetime(sample_dataframe['date'])
-
     date_range = analyzer._analyze_date_range(sample_dataframe, 'date')
 
     assert isinstance(date_range, DateRangeStats)
-    assert date_range.start == pd.Timestamp('2023-01-01')
-    assert date_range.end == pd.Timestamp('2023-02-28')
+    assert date_range.start == _T_START
+    assert date_range.end == _T_END
     assert date_range.days == 58  # 31 days in January + 28 days in February - 1 (inclusive)
     assert date_range.total_records == 5
 
 @pytest.mark.unit
-def test_analyze_top_contacts(sample_dataframe, sample_column_mapping):
+def test_analyze_top_contacts(analyzer, sample_dataframe, sample_column_mapping):
     """Test analyzing top contacts statistics."""
-    from src.analysis_layer.basic_statistics import BasicStatisticsAnalyzer
-    from src.analysis_layer.analysis_models import ContactStats
-
-    analyzer = BasicStatisticsAnalyzer()
-
-    # Convert date strings to datetime objects for comparison
-    sample_dataframe['date'] = pd.to_datetime(sample_dataframe['date'])
-
     top_contacts = analyzer._analyze_top_contacts(sample_dataframe, sample_column_mapping)
 
     assert isinstance(top_contacts, list)
@@ -125,13 +145,8 @@ def test_analyze_top_contacts(sample_dataframe, sample_column_mapping):
     assert top_contacts[2].percentage == 20.0  # 1/5 * 100
 
 @pytest.mark.unit
-def test_analyze_durations(sample_dataframe, sample_column_mapping):
+def test_analyze_durations(analyzer, sample_dataframe, sample_column_mapping):
     """Test analyzing duration statistics."""
-    from src.analysis_layer.basic_statistics import BasicStatisticsAnalyzer
-    from src.analysis_layer.analysis_models import DurationStats
-
-    analyzer = BasicStatisticsAnalyzer()
-
     duration_stats = analyzer._analyze_durations(sample_dataframe, 'duration')
 
     assert isinstance(duration_stats, DurationStats)
@@ -142,29 +157,16 @@ def test_analyze_durations(sample_dataframe, sample_column_mapping):
     assert duration_stats.min == 5  # Minimum duration
 
 @pytest.mark.unit
-def test_analyze_types(sample_dataframe, sample_column_mapping):
+def test_analyze_types(analyzer, sample_dataframe, sample_column_mapping):
     """Test analyzing type statistics."""
-    from src.analysis_layer.basic_statistics import BasicStatisticsAnalyzer
-    from src.analysis_layer.analysis_models import TypeStats
-
-    analyzer = BasicStatisticsAnalyzer()
-
     type_stats = analyzer._analyze_types(sample_dataframe, 'message_type')
 
     assert isinstance(type_stats, TypeStats)
     assert type_stats.types == {'sent': 3, 'received': 2}
 
 @pytest.mark.unit
-def test_analyze_full_statistics(sample_dataframe, sample_column_mapping):
+def test_analyze_full_statistics(analyzer, sample_dataframe, sample_column_mapping):
     """Test analyzing full statistics."""
-    from src.analysis_layer.basic_statistics import BasicStatisticsAnalyzer
-    from src.analysis_layer.analysis_models import BasicStatistics
-
-    analyzer = BasicStatisticsAnalyzer()
-
-    # Convert date strings to datetime objects for comparison
-    sample_dataframe['date'] = pd.to_datetime(sample_dataframe['date'])
-
     result, error = analyzer.analyze(sample_dataframe, sample_column_mapping)
 
     assert error == ""
@@ -172,8 +174,8 @@ def test_analyze_full_statistics(sample_dataframe, sample_column_mapping):
     assert result.total_records == 5
 
     # Check date range
-    assert result.date_range.start == pd.Timestamp('2023-01-01')
-    assert result.date_range.end == pd.Timestamp('2023-02-28')
+    assert result.date_range.start == _T_START
+    assert result.date_range.end == _T_END
 
     # Check top contacts
     assert len(result.top_contacts) == 3
@@ -186,63 +188,45 @@ def test_analyze_full_statistics(sample_dataframe, sample_column_mapping):
     assert result.type_stats.types == {'sent': 3, 'received': 2}
 
 @pytest.mark.unit
-def test_analyze_time_distribution(sample_dataframe):
+def test_analyze_time_distribution(analyzer, sample_dataframe):
     """Test analyzing time distribution."""
-    from src.analysis_layer.basic_statistics import BasicStatisticsAnalyzer
-
-    analyzer = BasicStatisticsAnalyzer()
-
-    # Convert date strings to datetime objects
-    sample_dataframe['date'] = pd.to_datetime(sample_dataframe['date'])
-
-    # Mock the cache functions
-    with patch('src.analysis_layer.basic_statistics.get_cached_result', return_value=None):
-        with patch('src.analysis_layer.basic_statistics.cache_result'):
-            with patch('src.analysis_layer.basic_statistics.calculate_time_distribution') as mock_calc:
-                # Configure the mock to return specific values
-                mock_calc.side_effect = lambda df, col, period: {
-                    'hour': {'0': 1, '12': 4},
-                    'day': {'Monday': 2, 'Friday': 3},
-                    'month': {'January': 3, 'February': 2}
-                }[period]
-
-                result = analyzer.analyze_time_distribution(sample_dataframe, 'date')
-
-                assert isinstance(result, dict)
-                assert 'hourly' in result
-                assert 'daily' in result
-                assert 'monthly' in result
-                assert result['hourly'] == {'0': 1, '12': 4}
-                assert result['daily'] == {'Monday': 2, 'Friday': 3}
-                assert result['monthly'] == {'January': 3, 'February': 2}
+    # Return one canned value per call, in the order the periods are calculated
+    mock_calc = MagicMock(side_effect=[_HOURLY, _DAILY, _MONTHLY])
+
+    # Mock the cache functions and the calculator in one patcher
+    with patch.multiple('src.analysis_layer.basic_statistics',
+                        get_cached_result=MagicMock(return_value=None),
+                        cache_result=MagicMock(),
+                        calculate_time_distribution=mock_calc):
+        result = analyzer.analyze_time_distribution(sample_dataframe, 'date')
+
+        assert [call.args[2] for call in mock_calc.call_args_list] == ['hour', 'day', 'month']
+        assert isinstance(result, dict)
+        assert 'hourly' in result
+        assert 'daily' in result
+        assert 'monthly' in result
+        assert result['hourly'] == _HOURLY
+        assert result['daily'] == _DAILY
+        assert result['monthly'] == _MONTHLY
 
 @pytest.mark.unit
-def test_analyze_message_frequency(sample_dataframe):
+def test_analyze_message_frequency(analyzer, sample_dataframe):
     """Test analyzing message frequency."""
-    from src.analysis_layer.basic_statistics import BasicStatisticsAnalyzer
-
-    analyzer = BasicStatisticsAnalyzer()
-
-    # Convert date strings to datetime objects
-    sample_dataframe['date'] = pd.to_datetime(sample_dataframe['date'])
-
-    # Mock the cache functions
-    with patch('src.analysis_layer.basic_statistics.get_cached_result', return_value=None):
-        with patch('src.analysis_layer.basic_statistics.cache_result'):
-            with patch('src.analysis_layer.basic_statistics.calculate_message_frequency') as mock_calc:
-                # Configure the mock to return specific values
-                mock_calc.side_effect = lambda df, col, period: {
-                    'day': 0.5,
-                    'week': 2.5,
-                    'month': 10.0
-                }[period]
-
-                result = analyzer.analyze_message_frequency(sample_dataframe, 'date')
-
-                assert isinstance(result, dict)
-                assert 'daily' in result
-                assert 'weekly' in result
-                assert 'monthly' in result
-                assert result['daily'] == 0.5
-                assert result['weekly'] == 2.5
-                assert result['monthly'] == 10.0
+    # Return one canned value per call, in the order the periods are calculated
+    mock_calc = MagicMock(side_effect=[_DAILY_FREQUENCY, _WEEKLY_FREQUENCY, _MONTHLY_FREQUENCY])
+
+    # Mock the cache functions and the calculator in one patcher
+    with patch.multiple('src.analysis_layer.basic_statistics',
+                        get_cached_result=MagicMock(return_value=None),
+                        cache_result=MagicMock(),
+                        calculate_message_frequency=mock_calc):
+        result = analyzer.analyze_message_frequency(sample_dataframe, 'date')
+
+        assert [call.args[2] for call in mock_calc.call_args_list] == ['day', 'week', 'month']
+        assert isinstance(result, dict)
+        assert 'daily' in result
+        assert 'weekly' in result
+        assert 'monthly' in result
+        assert result['daily'] == _DAILY_FREQUENCY
+        assert result['weekly'] == _WEEKLY_FREQUENCY
+        assert result['monthly'] == _MONTHLY_FREQUENCY
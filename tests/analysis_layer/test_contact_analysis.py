@@ -1,79 +1,78 @@
 """
 Tests for the contact analysis module.
 """
+import sys
 import pytest
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
+from src.analysis_layer.contact_analysis import ContactAnalyzer
 
-@pytest.fixture
+# Phone numbers of the three sample contacts
+_C_A = sys.intern('1234567890')  # Contact A - frequent
+_C_B = sys.intern('9876543210')  # Contact B - medium
+_C_C = sys.intern('5551234567')  # Contact C - infrequent
+
+# Columns of the sample contact records, built once at import
+_TIMESTAMPS = pd.to_datetime([
+    '2023-01-01 08:00:00',  # Morning
+    '2023-01-01 12:30:00',  # Afternoon
+    '2023-01-01 20:00:00',  # Evening
+    '2023-01-02 09:00:00',  # Morning
+    '2023-01-02 13:00:00',  # Afternoon
+    '2023-01-02 22:00:00',  # Evening
+    '2023-01-03 07:00:00',  # Morning
+    '2023-01-03 14:00:00',  # Afternoon
+    '2023-01-03 21:00:00',  # Evening
+    '2023-01-04 10:00:00',  # Morning
+]).to_numpy()
+_PHONES = np.array([
+    _C_A,  # frequent
+    _C_B,  # medium
+    _C_C,  # infrequent
+    _C_A,
+    _C_A,
+    _C_B,
+    _C_A,
+    _C_A,
+    _C_B,
+    _C_C,
+], dtype=object)
+_TYPES = np.array([
+    'sent', 'received', 'sent', 'received', 'sent',
+    'received', 'sent', 'received', 'sent', 'received',
+], dtype=object)
+_CONTENTS = np.array([
+    'Good morning!',
+    'Hello there',
+    'Good evening',
+    'How are you today?',
+    'I am fine, thanks!',
+    'What are you doing?',
+    'Just woke up',
+    'Want to meet later?',
+    'Sorry, busy tonight',
+    'No problem, another time',
+], dtype=object)
+# Zero for text messages, otherwise the call length in seconds
+_DURATIONS = np.array([0, 0, 0, 120, 180, 240, 0, 300, 0, 600], dtype=np.int64)
+
+@pytest.fixture(scope="module")
 def sample_contact_dataframe():
-    """Create a sample DataFrame for contact analysis testing."""
+    """Create a sample DataFrame for contact analysis testing.
+
+    The frame is shared by every test in the module and must not be modified.
+    """
     return pd.DataFrame({
-        'timestamp': pd.to_datetime([
-            '2023-01-01 08:00:00',  # Morning
-            '2023-01-01 12:30:00',  # Afternoon
-            '2023-01-01 20:00:00',  # Evening
-            '2023-01-02 09:00:00',  # Morning
-            '2023-01-02 13:00:00',  # Afternoon
-            '2023-01-02 22:00:00',  # Evening
-            '2023-01-03 07:00:00',  # Morning
-            '2023-01-03 14:00:00',  # Afternoon
-            '2023-01-03 21:00:00',  # Evening
-            '2023-01-04 10:00:00',  # Morning
-        ]),
-        'phone_number': [
-            '1234567890',  # Contact A - frequent
-            '9876543210',  # Contact B - medium
-            '5551234567',  # Contact C - infrequent
-            '1234567890',  # Contact A
-            '1234567890',  # Contact A
-            '9876543210',  # Contact B
-            '1234567890',  # Contact A
-            '1234567890',  # Contact A
-            '9876543210',  # Contact B
-            '5551234567',  # Contact C
-        ],
-        'message_type': [
-            'sent',
-            'received',
-            'sent',
-            'received',
-            'sent',
-            'received',
-            'sent',
-            'received',
-            'sent',
-            'received',
-        ],
-        'message_content': [
-            'Good morning!',
-            'Hello there',
-            'Good evening',
-            'How are you today?',
-            'I am fine, thanks!',
-            'What are you doing?',
-            'Just woke up',
-            'Want to meet later?',
-            'Sorry, busy tonight',
-            'No problem, another time',
-        ],
-        'duration': [
-            0,  # Text message
-            0,  # Text message
-            0,  # Text message
-            120,  # 2-minute call
-            180,  # 3-minute call
-            240,  # 4-minute call
-            0,  # Text message
-            300,  # 5-minute call
-            0,  # Text message
-            600,  # 10-minute call
-        ]
-    })
+        'timestamp': _TIMESTAMPS,
+        'phone_number': _PHONES,
+        'message_type': _TYPES,
+        'message_content': _CONTENTS,
+        'duration': _DURATIONS
+    }, copy=False)
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_column_mapping():
     """Create a sample column mapping for testing."""
     return {
@@ -84,39 +83,40 @@ def sample_column_mapping():
         'duration': 'duration'
     }
 
+@pytest.fixture(scope="module")
+def shared_analyzer():
+    """Create one ContactAnalyzer for the whole module."""
+    return ContactAnalyzer()
+
+@pytest.fixture
+def analyzer(shared_analyzer):
+    """Return the shared ContactAnalyzer with last_error cleared."""
+    shared_analyzer.last_error = None
+    return shared_analyzer
+
 @pytest.mark.unit
 def test_contact_analyzer_creation():
     """Test creating a ContactAnalyzer."""
-    from src.analysis_layer.contact_analysis import ContactAnalyzer
-    
     analyzer = ContactAnalyzer()
     assert analyzer is not None
 
 @pytest.mark.unit
-def test_analyze_contact_frequency(sample_contact_dataframe, sample_column_mapping):
+def test_analyze_contact_frequency(analyzer, sample_contact_dataframe, sample_column_mapping):
     """Test analyzing contact frequency."""
-    from src.analysis_layer.contact_analysis import ContactAnalyzer
-    
-    analyzer = ContactAnalyzer()
-    
     result = analyzer.analyze_contact_frequency(sample_contact_dataframe)
     
     assert isinstance(result, dict)
-    assert '1234567890' in result
-    assert '9876543210' in result
-    assert '5551234567' in result
+    assert _C_A in result
+    assert _C_B in result
+    assert _C_C in result
     
     # Contact A should have the highest frequency
-    assert result['1234567890'] > result['9876543210']
-    assert result['9876543210'] > result['5551234567']
+    assert result[_C_A] > result[_C_B]
+    assert result[_C_B] > result[_C_C]
 
 @pytest.mark.unit
-def test_categorize_contacts(sample_contact_dataframe, sample_column_mapping):
+def test_categorize_contacts(analyzer, sample_contact_dataframe, sample_column_mapping):
     """Test categorizing contacts."""
-    from src.analysis_layer.contact_analysis import ContactAnalyzer
-    
-    analyzer = ContactAnalyzer()
-    
     result = analyzer.categorize_contacts(sample_contact_dataframe)
     
     assert isinstance(result, dict)
@@ -125,61 +125,44 @@ def test_categorize_contacts(sample_contact_dataframe, sample_column_mapping):
     assert 'infrequent' in result
     
     # Contact A should be frequent
-    assert '1234567890' in result['frequent']
+    assert _C_A in result['frequent']
     # Contact B should be moderate
-    assert '9876543210' in result['moderate']
+    assert _C_B in result['moderate']
     # Contact C should be infrequent
-    assert '5551234567' in result['infrequent']
+    assert _C_C in result['infrequent']
 
 @pytest.mark.unit
-def test_analyze_contact_relationships(sample_contact_dataframe, sample_column_mapping):
+def test_analyze_contact_relationships(analyzer, sample_contact_dataframe, sample_column_mapping):
     """Test analyzing contact relationships."""
-    from src.analysis_layer.contact_analysis import ContactAnalyzer
-    
-    analyzer = ContactAnalyzer()
-    
     result = analyzer.analyze_contact_relationships(sample_contact_dataframe)
     
     assert isinstance(result, dict)
-    assert '1234567890' in result
-    assert '9876543210' in result
-    assert '5551234567' in result
+    assert _C_A in result
+    assert _C_B in result
+    assert _C_C in result
     
     # Check relationship metrics
-    for contact_id, metrics in result.items():
-        assert 'interaction_count' in metrics
-        assert 'last_interaction' in metrics
-        assert 'first_interaction' in metrics
-        assert 'avg_response_time' in metrics
-        assert 'relationship_score' in metrics
+    expected_keys = {'interaction_count', 'last_interaction', 'first_interaction',
+                     'avg_response_time', 'relationship_score'}
+    assert all(expected_keys <= metrics.keys() for metrics in result.values())
 
 @pytest.mark.unit
-def test_detect_contact_patterns(sample_contact_dataframe, sample_column_mapping):
+def test_detect_contact_patterns(analyzer, sample_contact_dataframe, sample_column_mapping):
     """Test detecting contact patterns."""
-    from src.analysis_layer.contact_analysis import ContactAnalyzer
-    
-    analyzer = ContactAnalyzer()
-    
     result = analyzer.detect_contact_patterns(sample_contact_dataframe)
     
     assert isinstance(result, dict)
-    assert '1234567890' in result
-    assert '9876543210' in result
-    assert '5551234567' in result
+    assert _C_A in result
+    assert _C_B in result
+    assert _C_C in result
     
     # Check pattern metrics
-    for contact_id, patterns in result.items():
-        assert 'time_patterns' in patterns
-        assert 'content_patterns' in patterns
-        assert 'response_patterns' in patterns
+    expected_keys = {'time_patterns', 'content_patterns', 'response_patterns'}
+    assert all(expected_keys <= patterns.keys() for patterns in result.values())
 
 @pytest.mark.unit
-def test_analyze_conversation_flow(sample_contact_dataframe, sample_column_mapping):
+def test_analyze_conversation_flow(analyzer, sample_contact_dataframe, sample_column_mapping):
     """Test analyzing conversation flow."""
-    from src.analysis_layer.contact_analysis import ContactAnalyzer
-    
-    analyzer = ContactAnalyzer()
-    
     result = analyzer.analyze_conversation_flow(sample_contact_dataframe)
     
     assert isinstance(result, dict)
@@ -190,26 +173,19 @@ def test_analyze_conversation_flow(sample_contact_dataframe, sample_column_mappi
     assert 'conversation_closers' in result
 
 @pytest.mark.unit
-def test_analyze_contact_importance(sample_contact_dataframe, sample_column_mapping):
+def test_analyze_contact_importance(analyzer, sample_contact_dataframe, sample_column_mapping):
     """Test analyzing contact importance."""
-    from src.analysis_layer.contact_analysis import ContactAnalyzer
-    
-    analyzer = ContactAnalyzer()
-    
     result = analyzer.analyze_contact_importance(sample_contact_dataframe)
     
     assert isinstance(result, list)
     assert len(result) == 3  # Three contacts
     
     # Contacts should be ordered by importance score
-    assert result[0]['phone_number'] == '1234567890'  # Most important
-    assert result[1]['phone_number'] == '9876543210'  # Second most important
-    assert result[2]['phone_number'] == '5551234567'  # Least important
+    assert result[0]['phone_number'] == _C_A  # Most important
+    assert result[1]['phone_number'] == _C_B  # Second most important
+    assert result[2]['phone_number'] == _C_C  # Least important
     
     # Check importance metrics
-    for contact in result:
-        assert 'phone_number' in contact
-        assert 'importance_score' in contact
-        assert 'interaction_count' in contact
-        assert 'response_rate' in contact
-        assert 'avg_response_time' in contact
+    expected_keys = {'phone_number', 'importance_score', 'interaction_count',
+                     'response_rate', 'avg_response_time'}
+    assert all(expected_keys <= contact.keys() for contact in result)
@@ -3,6 +3,7 @@ Tests for the insight generator module.
 """
 import pytest
 import pandas as pd
+import numpy as np
 from datetime import datetime
 from src.analysis_layer.insight_generator import (
     InsightGenerator, TIME_INSIGHT_ERROR, CONTACT_INSIGHT_ERROR,
@@ -10,47 +11,59 @@ from src.analysis_layer.insight_generator import (
 )
 
 
-# Fixtures for sample analysis results
-@pytest.fixture
+# Fixtures for sample analysis results, shared read-only by the whole module.
+# InsightGenerator reads distributions through Series.empty and idxmax(), so they
+# stay pandas Series, built from typed arrays rather than inferred lists.
+@pytest.fixture(scope="module")
 def sample_time_results():
     """Fixture for valid time analysis results."""
     return {
-        'hourly_distribution': pd.Series([10, 5, 20], index=[9, 10, 11]), # Peak at 11
-        'daily_distribution': pd.Series([50, 30, 70], index=['Mon', 'Tue', 'Wed']), # Peak on Wed
+        'hourly_distribution': pd.Series(np.array([10, 5, 20], dtype=np.int64),
+                                         index=pd.Index([9, 10, 11], dtype=np.int64)), # Peak at 11
+        'daily_distribution': pd.Series(np.array([50, 30, 70], dtype=np.int64),
+                                        index=pd.Index(['Mon', 'Tue', 'Wed'], dtype=object)), # Peak on Wed
         'anomalies': [datetime(2025, 4, 20, 3, 0)] # One anomaly
     }
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_contact_results():
     """Fixture for valid contact analysis results."""
+    contacts = pd.Index(['Alice', 'Bob', 'Charlie'], dtype=object)
     return {
-        'contact_frequency': pd.Series([100, 150, 80], index=['Alice', 'Bob', 'Charlie']), # Peak Bob
-        'contact_importance': pd.Series([0.8, 0.9, 0.7], index=['Alice', 'Bob', 'Charlie']), # Peak Bob
+        'contact_frequency': pd.Series(np.array([100, 150, 80], dtype=np.int64), index=contacts), # Peak Bob
+        'contact_importance': pd.Series(np.array([0.8, 0.9, 0.7], dtype=np.float64), index=contacts), # Peak Bob
         'categories': {'Friends': ['Alice', 'Bob'], 'Work': ['Charlie']}
     }
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_relationship_results():
     """Fixture for valid relationship analysis results."""
     return {
          'relationship_strength': {('Alice', 'Bob'): 0.9, ('Bob', 'Charlie'): 0.5}
      }
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_basic_stats():
     """Fixture for basic statistics results."""
     return {'total_messages': 330, 'unique_contacts': 3}
 
-@pytest.fixture
-def insight_generator():
-    """Fixture for InsightGenerator instance."""
+@pytest.fixture(scope="module")
+def shared_insight_generator():
+    """Fixture for one InsightGenerator shared by the whole module."""
     return InsightGenerator()
 
+@pytest.fixture
+def insight_generator(shared_insight_generator):
+    """Fixture for the shared InsightGenerator with last_error cleared."""
+    shared_insight_generator.last_error = None
+    return shared_insight_generator
+
 # --- Test Cases ---
 
 @pytest.mark.unit
-def test_insight_generator_creation(insight_generator):
+def test_insight_generator_creation():
     """Test creating an InsightGenerator."""
+    insight_generator = InsightGenerator()
     assert insight_generator is not None
     assert insight_generator.last_error is None
 
@@ -64,27 +77,6 @@ def test_generate_time_insights(insight_generator, sample_time_results):
     assert "Most active day: Wed." in insights
     assert "Detected 1 potential time anomalies." in insights
 
-@pytest.mark.unit
-def test_generate_time_insights_missing_data(insight_generator):
-    """Test time insights with missing or empty data."""
-    insights = insight_generator.generate_time_insights({})
-    assert insights == ["No specific time insights generated from the provided data."]
-    insights_empty_series = insight_generator.generate_time_insights(
-        {'hourly_distribution': pd.Series(dtype=float), 'daily_distribution': pd.Series(dtype=float)}
-    )
-    assert insights_empty_series == ["No specific time insights generated from the provided data."]
-
-
-@pytest.mark.unit
-def test_generate_time_insights_error(insight_generator, caplog):
-    """Test time insights generation with faulty data causing an error."""
-    faulty_results = {'hourly_distribution': 'not a series'}
-    insights = insight_generator.generate_time_insights(faulty_results)
-    assert insights == [TIME_INSIGHT_ERROR]
-    assert insight_generator.last_error is not None
-    assert "Error generating time insights" in caplog.text
-
-
 @pytest.mark.unit
 def test_generate_contact_insights(insight_generator, sample_contact_results):
     """Test generating contact-based insights."""
@@ -95,27 +87,6 @@ def test_generate_contact_insights(insight_generator, sample_contact_results):
     assert "Potentially most important contact (based on ranking): Bob." in insights
     assert "Contacts categorized into 2 groups." in insights
 
-@pytest.mark.unit
-def test_generate_contact_insights_missing_data(insight_generator):
-    """Test contact insights with missing or empty data."""
-    insights = insight_generator.generate_contact_insights({})
-    assert insights == ["No specific contact insights generated from the provided data."]
-    insights_empty_series = insight_generator.generate_contact_insights(
-         {'contact_frequency': pd.Series(dtype=float), 'contact_importance': pd.Series(dtype=float)}
-    )
-    assert insights_empty_series == ["No specific contact insights generated from the provided data."]
-
-
-@pytest.mark.unit
-def test_generate_contact_insights_error(insight_generator, caplog):
-    """Test contact insights generation with faulty data causing an error."""
-    faulty_results = {'contact_frequency': 'not a series'}
-    insights = insight_generator.generate_contact_insights(faulty_results)
-    assert insights == [CONTACT_INSIGHT_ERROR]
-    assert insight_generator.last_error is not None
-    assert "Error generating contact insights" in caplog.text
-
-
 @pytest.mark.unit
 def test_generate_relationship_insights(insight_generator, sample_relationship_results):
     """Test generating relationship insights."""
@@ -126,24 +97,39 @@ def test_generate_relationship_insights(insight_generator, sample_relationship_r
     assert "Strongest detected relationship pair: ('Alice', 'Bob')" in insights[0]
 
 @pytest.mark.unit
-def test_generate_relationship_insights_missing_data(insight_generator):
-    """Test relationship insights with missing or empty data."""
-    insights = insight_generator.generate_relationship_insights({})
-    assert insights == ["Basic relationship insights generated."]
-    insights_empty_dict = insight_generator.generate_relationship_insights(
-        {'relationship_strength': {}}
-    )
-    assert insights_empty_dict == ["Basic relationship insights generated."]
-
-
-@pytest.mark.unit
-def test_generate_relationship_insights_error(insight_generator, caplog):
-    """Test relationship insights generation with faulty data causing an error."""
-    faulty_results = {'relationship_strength': 'not a dict'}
-    insights = insight_generator.generate_relationship_insights(faulty_results)
-    assert insights == [RELATIONSHIP_INSIGHT_ERROR]
+@pytest.mark.parametrize("method,results,expected", [
+    ("generate_time_insights", {}, "No specific time insights generated from the provided data."),
+    ("generate_time_insights",
+     {'hourly_distribution': pd.Series(dtype=float), 'daily_distribution': pd.Series(dtype=float)},
+     "No specific time insights generated from the provided data."),
+    ("generate_contact_insights", {}, "No specific contact insights generated from the provided data."),
+    ("generate_contact_insights",
+     {'contact_frequency': pd.Series(dtype=float), 'contact_importance': pd.Series(dtype=float)},
+     "No specific contact insights generated from the provided data."),
+    ("generate_relationship_insights", {}, "Basic relationship insights generated."),
+    ("generate_relationship_insights", {'relationship_strength': {}}, "Basic relationship insights generated."),
+], ids=['time-missing', 'time-empty', 'contact-missing', 'contact-empty', 'relationship-missing', 'relationship-empty'])
+def test_generate_insights_missing_data(insight_generator, method, results, expected):
+    """Test time, contact and relationship insights with missing or empty data."""
+    insights = getattr(insight_generator, method)(results)
+    assert insights == [expected]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("method,faulty_results,error,log_message", [
+    ("generate_time_insights", {'hourly_distribution': 'not a series'},
+     TIME_INSIGHT_ERROR, "Error generating time insights"),
+    ("generate_contact_insights", {'contact_frequency': 'not a series'},
+     CONTACT_INSIGHT_ERROR, "Error generating contact insights"),
+    ("generate_relationship_insights", {'relationship_strength': 'not a dict'},
+     RELATIONSHIP_INSIGHT_ERROR, "Error generating relationship insights"),
+], ids=['time', 'contact', 'relationship'])
+def test_generate_insights_error(insight_generator, caplog, method, faulty_results, error, log_message):
+    """Test time, contact and relationship insights generation with faulty data causing an error."""
+    insights = getattr(insight_generator, method)(faulty_results)
+    assert insights == [error]
     assert insight_generator.last_error is not None
-    assert "Error generating relationship insights" in caplog.text
+    assert log_message in caplog.text
 
 
 @pytest.mark.unit
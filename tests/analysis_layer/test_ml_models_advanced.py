@@ -3,25 +3,30 @@ Advanced tests for ML models with synthetic data patterns.
 These tests simulate real-world usage with synthetic data containing clear patterns
 that the models should be able to detect.
 """
-import os
-import tempfile
-from pathlib import Path
 import pandas as pd
 import numpy as np
 import pytest
 
 from src.analysis_layer.ml_models import (
-    MLModel, 
     TimePatternModel, 
     ContactPatternModel, 
     AnomalyDetectionModel,
-    extract_features, 
-    evaluate_model
+    extract_features
 )
 
+# Every contact name used by the synthetic frames; their Contact columns are categorical
+_CONTACT_CATEGORIES = ['Alice', 'Bob', 'Charlie', 'Dave', 'Unknown', 'Scammer']
+
+# Contact pools for rng.choice, built once instead of converting a list on every draw
+_CONTACTS_4 = np.array(['Alice', 'Bob', 'Charlie', 'Dave'], dtype=object)
+_CONTACTS_3 = np.array(['Alice', 'Bob', 'Charlie'], dtype=object)
+_ANOMALY_CONTACTS = np.array(['Unknown', 'Scammer'], dtype=object)
+
 # ----- Test Fixtures -----
 
-@pytest.fixture
+# The synthetic frames are seeded and only read by the tests, so each is built once per session
+
+@pytest.fixture(scope="session")
 def synthetic_time_pattern_data():
     """
     Create synthetic data with clear time patterns:
@@ -30,30 +35,30 @@ def synthetic_time_pattern_data():
     - Weekend afternoon messages (1-5 PM, Sat-Sun)
     """
     # Generate 300 records with clear patterns
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     
     # Pattern 1: Morning weekday (100 records)
-    morning_hours = np.random.randint(6, 10, 100)  # 6-9 AM
-    morning_days = np.random.randint(0, 5, 100)    # Mon-Fri (0-4)
+    morning_hours = rng.integers(6, 10, 100, dtype=np.uint8)  # 6-9 AM
+    morning_days = rng.integers(0, 5, 100, dtype=np.uint8)    # Mon-Fri (0-4)
     
     # Pattern 2: Evening weekday (100 records)
-    evening_hours = np.random.randint(20, 24, 100)  # 8-11 PM
-    evening_days = np.random.randint(0, 5, 100)     # Mon-Fri (0-4)
+    evening_hours = rng.integers(20, 24, 100, dtype=np.uint8)  # 8-11 PM
+    evening_days = rng.integers(0, 5, 100, dtype=np.uint8)     # Mon-Fri (0-4)
     
     # Pattern 3: Weekend afternoon (100 records)
-    weekend_hours = np.random.randint(13, 18, 100)  # 1-5 PM
-    weekend_days = np.random.randint(5, 7, 100)     # Sat-Sun (5-6)
+    weekend_hours = rng.integers(13, 18, 100, dtype=np.uint8)  # 1-5 PM
+    weekend_days = rng.integers(5, 7, 100, dtype=np.uint8)     # Sat-Sun (5-6)
     
     # Combine patterns
     hours = np.concatenate([morning_hours, evening_hours, weekend_hours])
     days = np.concatenate([morning_days, evening_days, weekend_days])
     
-    # Add message lengths (not pattern-specific)
-    message_lengths = np.random.randint(10, 200, 300)
+    # Add message lengths (not pattern-specific); hour/dayofweek fit in uint8, lengths in uint16
+    message_lengths = rng.integers(10, 200, 300, dtype=np.uint16)
     
     # Create timestamps and DataFrame
-    timestamps = pd.date_range(start='2023-01-01', periods=300, freq='H')
-    np.random.shuffle(timestamps)  # Shuffle to avoid sequential ordering
+    # 300 distinct hourly timestamps in shuffled order, to avoid sequential ordering
+    timestamps = np.datetime64('2023-01-01', 'ns') + rng.permutation(300) * np.timedelta64(1, 'h')
     
     # Create DataFrame with the standard column names
     df = pd.DataFrame({
@@ -61,12 +66,13 @@ def synthetic_time_pattern_data():
         'hour': hours,
         'dayofweek': days,
         'MessageLength': message_lengths,
-        'Contact': np.random.choice(['Alice', 'Bob', 'Charlie', 'Dave'], 300)
+        'Contact': pd.Categorical(rng.choice(_CONTACTS_4, 300),
+                                  categories=_CONTACT_CATEGORIES)
     })
     
     return df
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def synthetic_contact_pattern_data():
     """
     Create synthetic data with clear contact patterns:
@@ -75,38 +81,38 @@ def synthetic_contact_pattern_data():
     - Charlie: long messages (150-300 chars)
     - Dave: mixed length messages (random)
     """
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     
     # 300 records with clear contact-based patterns
-    contacts = np.random.choice(['Alice', 'Bob', 'Charlie', 'Dave'], 300)
-    
-    # Define message lengths based on contact
-    message_lengths = []
-    for contact in contacts:
-        if contact == 'Alice':
-            message_lengths.append(np.random.randint(5, 21))  # Short messages
-        elif contact == 'Bob':
-            message_lengths.append(np.random.randint(50, 101))  # Medium messages
-        elif contact == 'Charlie':
-            message_lengths.append(np.random.randint(150, 301))  # Long messages
-        else:  # Dave
-            message_lengths.append(np.random.randint(5, 301))  # Random lengths
+    contacts = rng.choice(_CONTACTS_4, 300)
+    
+    # Define message lengths based on contact, filling each contact's rows at once
+    message_lengths = np.empty(300, dtype=np.uint16)
+    for contact, low, high in [
+        ('Alice', 5, 21),  # Short messages
+        ('Bob', 50, 101),  # Medium messages
+        ('Charlie', 150, 301),  # Long messages
+        ('Dave', 5, 301),  # Random lengths
+    ]:
+        mask = contacts == contact
+        message_lengths[mask] = rng.integers(low, high, mask.sum(), dtype=np.uint16)
     
     # Create DataFrame
-    timestamps = pd.date_range(start='2023-01-01', periods=300, freq='H')
-    np.random.shuffle(timestamps)  # Shuffle to avoid sequential ordering
+    # 300 distinct hourly timestamps in shuffled order, to avoid sequential ordering
+    timestamps = np.datetime64('2023-01-01', 'ns') + rng.permutation(300) * np.timedelta64(1, 'h')
+    timestamp_index = pd.DatetimeIndex(timestamps)
     
     df = pd.DataFrame({
         'Timestamp': timestamps,
-        'Contact': contacts,
+        'Contact': pd.Categorical(contacts, categories=_CONTACT_CATEGORIES),
         'MessageLength': message_lengths,
-        'hour': pd.DatetimeIndex(timestamps).hour,
-        'dayofweek': pd.DatetimeIndex(timestamps).dayofweek
+        'hour': timestamp_index.hour.to_numpy(dtype=np.uint8),
+        'dayofweek': timestamp_index.dayofweek.to_numpy(dtype=np.uint8)
     })
     
     return df
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def synthetic_anomaly_data():
     """
     Create synthetic data with clear anomalies:
@@ -115,19 +121,19 @@ def synthetic_anomaly_data():
       - Very long messages (500-1000 chars)
       - Very late night messages (1AM-4AM)
     """
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     
     # 280 normal records
-    normal_hours = np.random.randint(7, 24, 280)  # 7AM-11PM
-    normal_lengths = np.random.randint(10, 101, 280)  # 10-100 chars
-    normal_days = np.random.randint(0, 7, 280)
-    normal_contacts = np.random.choice(['Alice', 'Bob', 'Charlie'], 280)
+    normal_hours = rng.integers(7, 24, 280, dtype=np.uint8)  # 7AM-11PM
+    normal_lengths = rng.integers(10, 101, 280, dtype=np.uint16)  # 10-100 chars
+    normal_days = rng.integers(0, 7, 280, dtype=np.uint8)
+    normal_contacts = rng.choice(_CONTACTS_3, 280)
     
     # 20 anomalous records (both late night and long messages)
-    anomaly_hours = np.random.randint(1, 5, 20)  # 1AM-4AM
-    anomaly_lengths = np.random.randint(500, 1001, 20)  # 500-1000 chars
-    anomaly_days = np.random.randint(0, 7, 20)
-    anomaly_contacts = np.random.choice(['Unknown', 'Scammer'], 20)
+    anomaly_hours = rng.integers(1, 5, 20, dtype=np.uint8)  # 1AM-4AM
+    anomaly_lengths = rng.integers(500, 1001, 20, dtype=np.uint16)  # 500-1000 chars
+    anomaly_days = rng.integers(0, 7, 20, dtype=np.uint8)
+    anomaly_contacts = rng.choice(_ANOMALY_CONTACTS, 20)
     
     # Combine and create DataFrame
     hours = np.concatenate([normal_hours, anomaly_hours])
@@ -139,12 +145,12 @@ def synthetic_anomaly_data():
     anomaly_labels = np.concatenate([np.zeros(280), np.ones(20)])
     
     # Create timestamps for each record
-    timestamps = pd.date_range(start='2023-01-01', periods=300, freq='H')
-    np.random.shuffle(timestamps)  # Shuffle to mix normal and anomalous data
+    # 300 distinct hourly timestamps in shuffled order, to mix normal and anomalous data
+    timestamps = np.datetime64('2023-01-01', 'ns') + rng.permutation(300) * np.timedelta64(1, 'h')
     
     df = pd.DataFrame({
         'Timestamp': timestamps,
-        'Contact': contacts,
+        'Contact': pd.Categorical(contacts, categories=_CONTACT_CATEGORIES),
         'MessageLength': message_lengths,
         'hour': hours,
         'dayofweek': days,
@@ -153,78 +159,64 @@ def synthetic_anomaly_data():
     
     return df
 
-# ----- Test Cases -----
-
-def test_time_pattern_model_with_real_data(synthetic_time_pattern_data):
-    """Test if TimePatternModel can identify clear time clusters"""
-    # Extract features
-    features = synthetic_time_pattern_data[['hour', 'dayofweek']]
-    
-    # Create and train model
+@pytest.fixture(scope="module")
+def trained_time_model(synthetic_time_pattern_data):
+    """TimePatternModel trained once on the synthetic time patterns; tests only predict/evaluate."""
     model = TimePatternModel()
-    model.train(features)
-    
-    assert model.is_trained
-    
-    # Predict clusters
-    predictions = model.predict(features)
-    
-    # We should get 3 clusters (roughly matching our 3 patterns)
-    assert predictions is not None
-    assert not predictions.empty
-    
-    # The model should identify at least 2 distinct clusters (morning/evening and weekend)
-    # with silhouette score > 0.3
-    metrics = model.evaluate(features)
-    assert 'silhouette_score' in metrics
-    assert metrics['silhouette_score'] > 0.3
+    model.train(synthetic_time_pattern_data[['hour', 'dayofweek']])
+    return model
 
-def test_contact_pattern_model_with_real_data(synthetic_contact_pattern_data):
-    """Test if ContactPatternModel can cluster contacts with similar behaviors"""
-    # Extract features
-    features = synthetic_contact_pattern_data[['message_length']]
-    
-    # Create and train model
+@pytest.fixture(scope="module")
+def trained_contact_model(synthetic_contact_pattern_data):
+    """ContactPatternModel trained once on the synthetic contact patterns; tests only predict/evaluate."""
     model = ContactPatternModel()
-    model.train(features)
+    model.train(synthetic_contact_pattern_data[['message_length']])
+    return model
+
+@pytest.fixture(scope="module")
+def trained_anomaly_model(synthetic_anomaly_data):
+    """AnomalyDetectionModel trained once on the synthetic anomaly data; tests only predict/evaluate."""
+    model = AnomalyDetectionModel()
+    model.train(synthetic_anomaly_data[['hour', 'dayofweek', 'message_length']])
+    return model
+
+# ----- Test Cases -----
+
+@pytest.mark.parametrize("model_fixture, data_fixture, feature_cols, label_col, metric, threshold", [
+    # TimePatternModel should find distinct time clusters (morning/evening and weekend)
+    ('trained_time_model', 'synthetic_time_pattern_data', ['hour', 'dayofweek'], None, 'silhouette_score', 0.3),
+    # ContactPatternModel should cluster contacts with similar behaviors
+    ('trained_contact_model', 'synthetic_contact_pattern_data', ['message_length'], None, 'silhouette_score', 0.3),
+    # AnomalyDetectionModel should flag some of the planted anomalies
+    ('trained_anomaly_model', 'synthetic_anomaly_data', ['hour', 'dayofweek', 'message_length'], 'is_anomaly',
+     'num_anomalies_detected', 0),
+], ids=['time_pattern', 'contact_pattern', 'anomaly_detection'])
+def test_model_with_real_data(request, model_fixture, data_fixture, feature_cols, label_col, metric, threshold):
+    """Test if each model finds the patterns planted in its synthetic data"""
+    model = request.getfixturevalue(model_fixture)
+    data = request.getfixturevalue(data_fixture)
+    # Extract features (excluding any label column)
+    features = data[feature_cols]
+    labels = data[label_col] if label_col else None
     
     assert model.is_trained
     
-    # Predict clusters
+    # Predict clusters or anomalies
     predictions = model.predict(features)
     
     assert predictions is not None
     assert not predictions.empty
     
-    # The model should cluster contacts with similar behaviors
-    metrics = model.evaluate(features)
-    assert 'silhouette_score' in metrics
-    assert metrics['silhouette_score'] > 0.3
+    metrics = model.evaluate(features, labels)
+    assert metric in metrics
+    assert metrics[metric] > threshold
 
-def test_anomaly_detection_model_with_real_data(synthetic_anomaly_data):
-    """Test if AnomalyDetectionModel can detect anomalous messages"""
-    # Extract features (excluding the 'is_anomaly' label)
+def test_anomaly_detection_model_accuracy(trained_anomaly_model, synthetic_anomaly_data):
+    """Test if AnomalyDetectionModel detects roughly the anomalies planted in the data"""
     features = synthetic_anomaly_data[['hour', 'dayofweek', 'message_length']]
-    true_labels = synthetic_anomaly_data['is_anomaly']
-    
-    # Create and train model
-    model = AnomalyDetectionModel()
-    model.train(features)
-    
-    assert model.is_trained
-    
-    # Predict anomalies
-    predictions = model.predict(features)
     
-    assert predictions is not None
-    assert not predictions.empty
-    
-    # Calculate accuracy (should be > 0.9 since we created clear anomalies)
     # 0:normal, 1:anomaly for both predictions and true_labels
-    metrics = model.evaluate(features, true_labels)
-    
-    assert 'num_anomalies_detected' in metrics
-    assert metrics['num_anomalies_detected'] > 0
+    metrics = trained_anomaly_model.evaluate(features, synthetic_anomaly_data['is_anomaly'])
     
     # We created 20 anomalies
     assert abs(metrics['num_anomalies_detected'] - 20) < 10  # Allow some error margin
@@ -253,11 +245,13 @@ def test_feature_extraction_with_default_mapping(synthetic_time_pattern_data):
 
 def test_feature_extraction_with_custom_mapping():
     """Test feature extraction with custom column mapping"""
+    rng = np.random.default_rng(42)
+    
     # Create DataFrame with different column names
     df = pd.DataFrame({
         'msg_time': pd.date_range(start='2023-01-01', periods=50, freq='H'),
-        'person': np.random.choice(['Alice', 'Bob', 'Charlie'], 50),
-        'length': np.random.randint(10, 200, 50)
+        'person': rng.choice(_CONTACTS_3, 50),
+        'length': rng.integers(10, 200, 50)
     })
     
     # Custom mapping
@@ -284,59 +278,52 @@ def test_feature_extraction_with_custom_mapping():
     assert features['is_weekend'].dtype == int
     assert features['message_length'].dtype == int
 
-def test_model_persistence():
+def test_model_persistence(tmp_path):
     """Test saving and loading ML models"""
+    rng = np.random.default_rng(42)
+    
     # Create a simple model
     model = TimePatternModel()
     
     # Create synthetic data
     df = pd.DataFrame({
-        'hour': np.random.randint(0, 24, 100),
-        'dayofweek': np.random.randint(0, 7, 100)
+        'hour': rng.integers(0, 24, 100),
+        'dayofweek': rng.integers(0, 7, 100)
     })
     
     model.train(df)
     assert model.is_trained
     
-    # Create a temporary directory for saving the model
-    with tempfile.TemporaryDirectory() as temp_dir:
-        file_path = Path(temp_dir) / "time_model.joblib"
-        
-        # Save the model
-        success = model.save(file_path)
-        assert success
-        assert file_path.exists()
-        
-        # Load into a new model instance
-        new_model = TimePatternModel()
-        success = new_model.load(file_path)
-        
-        assert success
-        assert new_model.is_trained
-        
-        # Make predictions with both models and ensure they match
-        orig_preds = model.predict(df)
-        new_preds = new_model.predict(df)
-        
-        assert orig_preds.equals(new_preds)
-
-def test_model_error_handling():
-    """Test ML model error handling"""
-    # Case 1: Empty features
-    empty_df = pd.DataFrame()
-    model = TimePatternModel()
-    model.train(empty_df)
+    # save()/load() only accept paths, so round-trip through pytest's per-test directory
+    file_path = tmp_path / "time_model.joblib"
     
-    assert not model.is_trained
-    assert model.last_error is not None
+    # Save the model
+    success = model.save(file_path)
+    assert success
+    assert file_path.exists()
     
-    # Case 2: Missing required columns
-    invalid_df = pd.DataFrame({
-        'irrelevant': np.random.random(10)
-    })
+    # Load into a new model instance
+    new_model = TimePatternModel()
+    success = new_model.load(file_path)
     
-    model = ContactPatternModel()
-    model.train(invalid_df)
+    assert success
+    assert new_model.is_trained
+    
+    # Make predictions with both models and ensure they match
+    orig_preds = model.predict(df)
+    new_preds = new_model.predict(df)
+    
+    assert orig_preds.equals(new_preds)
+
+@pytest.mark.parametrize("model_cls, features", [
+    (TimePatternModel, pd.DataFrame()),
+    (ContactPatternModel, pd.DataFrame({'irrelevant': np.zeros(10)})),
+], ids=['empty_features', 'missing_columns'])
+def test_model_error_handling(model_cls, features):
+    """Test that training on unusable features leaves the model untrained"""
+    model = model_cls()
+    model.train(features)
     
     assert not model.is_trained
     assert model.model is None
+    assert model.last_error is not None
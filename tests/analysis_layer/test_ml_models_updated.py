@@ -10,7 +10,7 @@ from src.analysis_layer.ml_models import (
     MLModel, TimePatternModel, ContactPatternModel,
     AnomalyDetectionModel, extract_features, run_model_evaluation, evaluate_model
 )
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_dataframe():
     """Sample DataFrame similar to what might come from the repository."""
     data = {
@@ -20,7 +20,7 @@ def sample_dataframe():
     }
     return pd.DataFrame(data)
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_dataframe_missing_cols():
     """Sample DataFrame with missing columns needed for feature extraction."""
     data = {
@@ -30,12 +30,12 @@ def sample_dataframe_missing_cols():
     return pd.DataFrame(data)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_features(sample_dataframe):
-    """Sample features extracted from the dataframe."""
+    """Sample features extracted from the dataframe, once per session (extract_features is deterministic)."""
     return extract_features(sample_dataframe)
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_labels():
     """Sample labels (e.g., for a supervised task)."""
     return pd.Series([0, 1, 0, 1, 0]) # Example binary labels
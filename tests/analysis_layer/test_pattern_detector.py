@@ -4,148 +4,125 @@ Tests for the pattern detector module.
 import pytest
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from unittest.mock import patch, MagicMock
 
-@pytest.fixture
+from src.analysis_layer.pattern_detector import PatternDetector
+
+@pytest.fixture(scope="session")
 def sample_pattern_dataframe():
-    """Create a sample DataFrame for pattern detection testing."""
-    # Create a DataFrame with clear patterns
-    dates = []
-    numbers = []
-    types = []
-    contents = []
-    durations = []
-    
-    # Pattern 1: Weekly check-in calls every Monday at 9 AM
-    start_date = datetime(2023, 1, 2)  # First Monday
-    for i in range(4):  # 4 weeks
-        call_time = start_date + timedelta(days=i*7, hours=9)
-        dates.append(call_time)
-        numbers.append('1234567890')
-        types.append('sent')
-        contents.append('Weekly check-in')
-        durations.append(300)  # 5-minute call
-    
-    # Pattern 2: Daily good morning texts around 7 AM
-    start_date = datetime(2023, 1, 1)
-    for i in range(30):  # 30 days
-        text_time = start_date + timedelta(days=i, hours=7, minutes=np.random.randint(-15, 15))
-        dates.append(text_time)
-        numbers.append('9876543210')
-        types.append('sent')
-        contents.append('Good morning!')
-        durations.append(0)  # Text message
-    
-    # Pattern 3: Friday night calls around 8 PM
-    start_date = datetime(2023, 1, 6)  # First Friday
-    for i in range(4):  # 4 weeks
-        call_time = start_date + timedelta(days=i*7, hours=20, minutes=np.random.randint(-30, 30))
-        dates.append(call_time)
-        numbers.append('5551234567')
-        types.append('received')
-        contents.append('Friday night call')
-        durations.append(np.random.randint(1800, 3600))  # 30-60 minute call
-    
-    # Pattern 4: Content pattern - "Meeting" texts followed by calls
-    start_date = datetime(2023, 1, 5)  # First Thursday
-    for i in range(4):  # 4 weeks
-        # Text about meeting
-        text_time = start_date + timedelta(days=i*7, hours=10)
-        dates.append(text_time)
-        numbers.append('3334445555')
-        types.append('sent')
-        contents.append('Meeting at 2pm today')
-        durations.append(0)  # Text message
-        
-        # Call after meeting
-        call_time = start_date + timedelta(days=i*7, hours=15)  # 3 PM
-        dates.append(call_time)
-        numbers.append('3334445555')
-        types.append('sent')
-        contents.append('Call after meeting')
-        durations.append(np.random.randint(300, 600))  # 5-10 minute call
-    
-    # Add some random noise
-    start_date = datetime(2023, 1, 1)
-    for i in range(20):
-        random_time = start_date + timedelta(
-            days=np.random.randint(0, 30),
-            hours=np.random.randint(8, 22),
-            minutes=np.random.randint(0, 60)
-        )
-        dates.append(random_time)
-        numbers.append(np.random.choice(['1234567890', '9876543210', '5551234567', '3334445555', '7778889999']))
-        types.append(np.random.choice(['sent', 'received']))
-        contents.append(np.random.choice(['Hello', 'Hi', 'How are you?', 'Call me', 'Text me later']))
-        durations.append(np.random.randint(0, 300))
-    
+    """Create a sample DataFrame for pattern detection testing.
+
+    The frame is built once per session; PatternDetector works on copies and
+    tests must not modify it.
+    """
+    rng = np.random.default_rng(42)
+    weeks = np.arange(4) * np.timedelta64(7, 'D')
+
+    # Pattern 1: Weekly check-in calls every Monday at 9 AM (first Monday, 4 weeks)
+    checkin_times = np.datetime64('2023-01-02T09:00', 'ns') + weeks
+
+    # Pattern 2: Daily good morning texts around 7 AM (30 days)
+    morning_times = (np.datetime64('2023-01-01T07:00', 'ns') + np.arange(30).astype('timedelta64[D]')
+                     + rng.integers(-15, 15, 30).astype('timedelta64[m]'))
+
+    # Pattern 3: Friday night calls around 8 PM (first Friday, 4 weeks)
+    friday_times = (np.datetime64('2023-01-06T20:00', 'ns') + weeks
+                    + rng.integers(-30, 30, 4).astype('timedelta64[m]'))
+
+    # Pattern 4: Content pattern - "Meeting" texts at 10 AM followed by calls at 3 PM (first Thursday, 4 weeks)
+    meeting_text_times = np.datetime64('2023-01-05T10:00', 'ns') + weeks
+    meeting_call_times = np.datetime64('2023-01-05T15:00', 'ns') + weeks
+
+    # Number, type and content of each pattern's records, in the order of the times above
+    pattern_sizes = [4, 30, 4, 4, 4]
+    pattern_numbers = np.repeat(np.array(
+        ['1234567890', '9876543210', '5551234567', '3334445555', '3334445555'], dtype=object), pattern_sizes)
+    pattern_types = np.repeat(np.array(
+        ['sent', 'sent', 'received', 'sent', 'sent'], dtype=object), pattern_sizes)
+    pattern_contents = np.repeat(np.array(
+        ['Weekly check-in', 'Good morning!', 'Friday night call', 'Meeting at 2pm today', 'Call after meeting'],
+        dtype=object), pattern_sizes)
+    pattern_durations = np.concatenate([
+        np.full(4, 300),  # 5-minute call
+        np.zeros(30, dtype=int),  # Text message
+        rng.integers(1800, 3600, 4),  # 30-60 minute call
+        np.zeros(4, dtype=int),  # Text message
+        rng.integers(300, 600, 4),  # 5-10 minute call
+    ])
+
+    # Add some random noise: 20 records at random times between 8 AM and 10 PM over 30 days
+    noise_times = (np.datetime64('2023-01-01', 'ns') + rng.integers(0, 30, 20).astype('timedelta64[D]')
+                   + rng.integers(8, 22, 20).astype('timedelta64[h]')
+                   + rng.integers(0, 60, 20).astype('timedelta64[m]'))
+    noise_numbers = rng.choice(np.array(['1234567890', '9876543210', '5551234567', '3334445555', '7778889999'],
+                                        dtype=object), 20)
+    noise_types = rng.choice(np.array(['sent', 'received'], dtype=object), 20)
+    noise_contents = rng.choice(np.array(['Hello', 'Hi', 'How are you?', 'Call me', 'Text me later'],
+                                         dtype=object), 20)
+    noise_durations = rng.integers(0, 300, 20)
+
+    timestamps = np.concatenate([checkin_times, morning_times, friday_times, meeting_text_times,
+                                 meeting_call_times, noise_times])
+    # Put every column in timestamp order with one argsort
+    order = np.argsort(timestamps, kind='stable')
+
     return pd.DataFrame({
-        'timestamp': pd.Series(dates),
-        'phone_number': numbers,
-        'message_type': types,
-        'message_content': contents,
-        'duration': durations
-    }).sort_values('timestamp').reset_index(drop=True)
+        'timestamp': timestamps[order],
+        'phone_number': np.concatenate([pattern_numbers, noise_numbers])[order],
+        'message_type': np.concatenate([pattern_types, noise_types])[order],
+        'message_content': np.concatenate([pattern_contents, noise_contents])[order],
+        'duration': np.concatenate([pattern_durations, noise_durations])[order]
+    })
+
+@pytest.fixture(scope="module")
+def shared_detector():
+    """Create one PatternDetector for the whole module."""
+    return PatternDetector()
 
 @pytest.fixture
-def sample_column_mapping():
-    """Create a sample column mapping for testing."""
-    return {
-        'timestamp': 'timestamp',
-        'phone_number': 'phone_number',
-        'message_type': 'message_type',
-        'message_content': 'message_content',
-        'duration': 'duration'
-    }
+def detector(shared_detector):
+    """Return the shared PatternDetector with last_error cleared."""
+    shared_detector.last_error = None
+    return shared_detector
 
 @pytest.mark.unit
 def test_pattern_detector_creation():
     """Test creating a PatternDetector."""
-    from src.analysis_layer.pattern_detector import PatternDetector
-    
     detector = PatternDetector()
     assert detector is not None
 
+def _describes(description, terms):
+    """Check that a pattern description mentions every term.
+
+    Capitalised terms (day names) must match exactly; others match case-insensitively.
+    """
+    return all(term in description if term[0].isupper() else term in description.lower()
+               for term in terms)
+
 @pytest.mark.unit
-def test_detect_time_patterns(sample_pattern_dataframe, sample_column_mapping):
-    """Test detecting time patterns."""
-    from src.analysis_layer.pattern_detector import PatternDetector
-    
-    detector = PatternDetector()
-    
-    result = detector.detect_time_patterns(sample_pattern_dataframe)
+@pytest.mark.parametrize("method, expected_descriptions", [
+    # Monday morning check-ins, daily morning texts and Friday evening calls
+    ('detect_time_patterns', [('Monday', 'morning'), ('daily', 'morning'), ('Friday', 'evening')]),
+    # "Good morning" texts and "meeting" texts/calls
+    ('detect_content_patterns', [('morning',), ('meeting',)]),
+], ids=['time', 'content'])
+def test_detect_patterns(detector, sample_pattern_dataframe, method, expected_descriptions):
+    """Test detecting time and content patterns."""
+    result = getattr(detector, method)(sample_pattern_dataframe)
     
     assert isinstance(result, list)
     assert len(result) > 0
     
     # Check pattern structure
-    pattern = result[0]
-    assert 'pattern_type' in pattern
-    assert 'description' in pattern
-    assert 'confidence' in pattern
-    assert 'occurrences' in pattern
-    assert 'examples' in pattern
+    assert result[0].keys() >= {'pattern_type', 'description', 'confidence', 'occurrences', 'examples'}
     
     # Check for specific patterns
-    pattern_descriptions = [p['description'] for p in result]
-    
-    # Should detect Monday morning pattern
-    assert any('Monday' in desc and 'morning' in desc.lower() for desc in pattern_descriptions)
-    
-    # Should detect daily morning pattern
-    assert any('daily' in desc.lower() and 'morning' in desc.lower() for desc in pattern_descriptions)
-    
-    # Should detect Friday evening pattern
-    assert any('Friday' in desc and 'evening' in desc.lower() for desc in pattern_descriptions)
+    pattern_descriptions = [p.get('description', '') for p in result]
+    for terms in expected_descriptions:
+        assert any(_describes(desc, terms) for desc in pattern_descriptions), terms
 
 @pytest.mark.unit
-def test_detect_contact_patterns(sample_pattern_dataframe, sample_column_mapping):
+def test_detect_contact_patterns(detector, sample_pattern_dataframe):
     """Test detecting contact patterns."""
-    from src.analysis_layer.pattern_detector import PatternDetector
-    
-    detector = PatternDetector()
-    
     result = detector.detect_contact_patterns(sample_pattern_dataframe)
     
     assert isinstance(result, dict)
@@ -166,12 +143,8 @@ def test_detect_contact_patterns(sample_pattern_dataframe, sample_column_mapping
     assert any('Friday' in p['description'] for p in result['5551234567']['time_patterns'])
 
 @pytest.mark.unit
-def test_detect_sequence_patterns(sample_pattern_dataframe, sample_column_mapping):
+def test_detect_sequence_patterns(detector, sample_pattern_dataframe):
     """Test detecting sequence patterns."""
-    from src.analysis_layer.pattern_detector import PatternDetector
-    
-    detector = PatternDetector()
-    
     result = detector.detect_sequence_patterns(sample_pattern_dataframe)
     
     assert isinstance(result, list)
@@ -189,40 +162,8 @@ def test_detect_sequence_patterns(sample_pattern_dataframe, sample_column_mappin
     assert len(meeting_pattern) > 0
 
 @pytest.mark.unit
-def test_detect_content_patterns(sample_pattern_dataframe, sample_column_mapping):
-    """Test detecting content patterns."""
-    from src.analysis_layer.pattern_detector import PatternDetector
-    
-    detector = PatternDetector()
-    
-    result = detector.detect_content_patterns(sample_pattern_dataframe)
-    
-    assert isinstance(result, list)
-    assert len(result) > 0
-    
-    # Check pattern structure
-    pattern = result[0]
-    assert 'pattern_type' in pattern
-    assert 'description' in pattern
-    assert 'confidence' in pattern
-    assert 'occurrences' in pattern
-    assert 'examples' in pattern
-    
-    # Should detect "good morning" pattern
-    morning_pattern = [p for p in result if 'morning' in p.get('description', '').lower()]
-    assert len(morning_pattern) > 0
-    
-    # Should detect "meeting" pattern
-    meeting_pattern = [p for p in result if 'meeting' in p.get('description', '').lower()]
-    assert len(meeting_pattern) > 0
-
-@pytest.mark.unit
-def test_calculate_pattern_significance(sample_pattern_dataframe, sample_column_mapping):
+def test_calculate_pattern_significance(detector, sample_pattern_dataframe):
     """Test calculating pattern significance."""
-    from src.analysis_layer.pattern_detector import PatternDetector
-    
-    detector = PatternDetector()
-    
     # First get some patterns
     time_patterns = detector.detect_time_patterns(sample_pattern_dataframe)
     
@@ -242,12 +183,8 @@ def test_calculate_pattern_significance(sample_pattern_dataframe, sample_column_
     assert significance_scores == sorted(significance_scores, reverse=True)
 
 @pytest.mark.unit
-def test_filter_patterns_by_confidence(sample_pattern_dataframe, sample_column_mapping):
+def test_filter_patterns_by_confidence(detector, sample_pattern_dataframe):
     """Test filtering patterns by confidence."""
-    from src.analysis_layer.pattern_detector import PatternDetector
-    
-    detector = PatternDetector()
-    
     # First get some patterns
     time_patterns = detector.detect_time_patterns(sample_pattern_dataframe)
     
@@ -6,41 +6,57 @@ This tests that the response analyzer correctly integrates with the pattern dete
 
 import pytest
 import pandas as pd
-from datetime import datetime, timedelta
 from unittest.mock import MagicMock, patch
 
 from src.analysis_layer.pattern_detector import PatternDetector
 from src.analysis_layer.advanced_patterns.response_analyzer import ResponseAnalyzer
 
+# Full pattern detection trains the ML models; skip these with -m "not slow"
+pytestmark = pytest.mark.slow
 
-@pytest.fixture
+
+@pytest.fixture(scope="module")
 def sample_conversation_df():
     """Create a sample DataFrame with clear response patterns."""
-    data = [
-        # A conversation with quick responses
-        {'timestamp': datetime(2023, 1, 1, 10, 0), 'phone_number': '5551234567', 'message_type': 'sent'},
-        {'timestamp': datetime(2023, 1, 1, 10, 2), 'phone_number': '5551234567', 'message_type': 'received'},  # 2min
-        {'timestamp': datetime(2023, 1, 1, 10, 3), 'phone_number': '5551234567', 'message_type': 'sent'},      # 1min
-        {'timestamp': datetime(2023, 1, 1, 10, 5), 'phone_number': '5551234567', 'message_type': 'received'},  # 2min
-        {'timestamp': datetime(2023, 1, 1, 10, 6), 'phone_number': '5551234567', 'message_type': 'sent'},      # 1min
-
-        # A gap of 3 hours
-        
-        # A conversation with slow responses
-        {'timestamp': datetime(2023, 1, 1, 14, 0), 'phone_number': '5559876543', 'message_type': 'received'},
-        {'timestamp': datetime(2023, 1, 1, 15, 0), 'phone_number': '5559876543', 'message_type': 'sent'},      # 60min 
-        {'timestamp': datetime(2023, 1, 1, 15, 30), 'phone_number': '5559876543', 'message_type': 'received'}, # 30min
-        {'timestamp': datetime(2023, 1, 1, 17, 0), 'phone_number': '5559876543', 'message_type': 'sent'},      # 90min
-    ]
-    return pd.DataFrame(data)
-
-
-def test_integration_with_pattern_detector(sample_conversation_df):
+    return pd.DataFrame({
+        # Minutes after 10:00: a conversation with quick responses (2, 1, 2, 1 min apart),
+        # a gap of about 3 hours, then a conversation with slow responses (60, 30, 90 min apart)
+        'timestamp': pd.Timestamp('2023-01-01 10:00') + pd.to_timedelta(
+            [0, 2, 3, 5, 6, 4*60, 5*60, 5*60 + 30, 7*60], unit='m'),
+        'phone_number': ['5551234567'] * 5 + ['5559876543'] * 4,
+        'message_type': ['sent', 'received', 'sent', 'received', 'sent',
+                         'received', 'sent', 'received', 'sent'],
+    })
+
+
+@pytest.fixture(scope="module")
+def shared_mock_response_analyzer():
+    """Create one ResponseAnalyzer-specced mock for the whole module."""
+    return MagicMock(spec=ResponseAnalyzer)
+
+
+@pytest.fixture
+def mock_response_analyzer(shared_mock_response_analyzer):
+    """Return the shared ResponseAnalyzer mock with calls, return values and side effects cleared."""
+    shared_mock_response_analyzer.reset_mock(return_value=True, side_effect=True)
+    return shared_mock_response_analyzer
+
+
+@pytest.fixture(scope="module")
+def base_detector():
+    """Create one PatternDetector backed by a real ResponseAnalyzer for the whole module."""
+    return PatternDetector(response_analyzer=ResponseAnalyzer())
+
+
+@pytest.fixture
+def pattern_detector(base_detector):
+    """Return the shared PatternDetector with last_error cleared."""
+    base_detector.last_error = None
+    return base_detector
+
+
+def test_integration_with_pattern_detector(sample_conversation_df, pattern_detector):
     """Test that ResponseAnalyzer integrates correctly with PatternDetector."""
-    # Create analyzer and detector
-    response_analyzer = ResponseAnalyzer()
-    pattern_detector = PatternDetector(response_analyzer=response_analyzer)
-    
     # Set up column mapping
     column_mapping = {
         'timestamp': 'timestamp',
@@ -66,21 +82,22 @@ def test_integration_with_pattern_detector(sample_conversation_df):
     pattern_types = {p.get("subtype", "unknown") for p in response_patterns}
     
     # We should have either quick_responder or delayed_responder pattern
-    assert any(subtype in pattern_types for subtype in ("quick_responder", "delayed_responder", "average"))
+    assert pattern_types & {"quick_responder", "delayed_responder", "average"}, \
+        f"Missing expected subtype in {pattern_types}"
     
     # There shouldn't be any errors related to response analyzer integration
     response_errors = [e for e in results.get("errors", []) if "ResponseAnalyzer" in e]
     assert len(response_errors) == 0, f"Found response analyzer errors: {response_errors}"
 
 
-def test_error_handling_in_integration(sample_conversation_df):
+def test_error_handling_in_integration(sample_conversation_df, pattern_detector, mock_response_analyzer, monkeypatch):
     """Test that errors in ResponseAnalyzer are properly handled by PatternDetector."""
-    # Create a mock response analyzer that raises an exception
-    mock_analyzer = MagicMock(spec=ResponseAnalyzer)
+    # Make the mock response analyzer raise an exception
+    mock_analyzer = mock_response_analyzer
     mock_analyzer.analyze_response_patterns.side_effect = ValueError("Test error")
     
-    # Create pattern detector with the mock analyzer
-    pattern_detector = PatternDetector(response_analyzer=mock_analyzer)
+    # Swap the mock analyzer into the shared detector for this test only
+    monkeypatch.setattr(pattern_detector, 'response_analyzer', mock_analyzer)
     
     # Run pattern detection
     results = pattern_detector.detect_all_patterns(sample_conversation_df)
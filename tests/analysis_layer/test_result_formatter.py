@@ -7,7 +7,7 @@ import json
 from datetime import datetime
 from unittest.mock import patch, MagicMock
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_basic_statistics():
     """Create a sample BasicStatistics object for testing."""
     from src.analysis_layer.analysis_models import BasicStatistics, DateRangeStats, ContactStats, DurationStats, TypeStats
@@ -166,21 +166,30 @@ def test_get_formatter(sample_basic_statistics):
         get_formatter("unknown_format")
 
 @pytest.mark.unit
-def test_format_result(sample_basic_statistics):
+@pytest.mark.parametrize("formatter_name, must_contain", [
+    ("text", "Basic Statistics Summary"),
+    ("json", None),  # Checked by parsing instead
+    ("csv", "total_records,5"),
+    ("html", "<html"),
+    ("markdown", "# Basic Statistics Summary"),
+], ids=["text", "json", "csv", "html", "markdown"])
+def test_format_result(sample_basic_statistics, formatter_name, must_contain):
     """Test formatting results with the format_result function."""
     from src.analysis_layer.result_formatter import format_result
 
-    # Test text format
-    text_result = format_result(sample_basic_statistics, "text")
-    assert isinstance(text_result, str)
-    assert "Basic Statistics Summary" in text_result
+    result = format_result(sample_basic_statistics, formatter_name)
+    assert isinstance(result, str)
 
-    # Test JSON format
-    json_result = format_result(sample_basic_statistics, "json")
-    assert isinstance(json_result, str)
-    parsed = json.loads(json_result)
-    assert parsed["total_records"] == 5
+    if must_contain is None:
+        parsed = json.loads(result)
+        assert parsed["total_records"] == 5
+    else:
+        assert must_contain in result
+
+@pytest.mark.unit
+def test_format_result_unknown_format(sample_basic_statistics):
+    """Test that format_result rejects an unknown format."""
+    from src.analysis_layer.result_formatter import format_result
 
-    # Test with unknown format
     with pytest.raises(ValueError):
         format_result(sample_basic_statistics, "unknown_format")
@@ -7,7 +7,7 @@ import numpy as np
 from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_dataframe():
     """Create a sample DataFrame for testing."""
     return pd.DataFrame({
@@ -18,6 +18,16 @@ def sample_dataframe():
         'duration': [10, 15, 5, 20, 8]
     })
 
+@pytest.fixture(scope="module")
+def sample_time_parts(sample_dataframe):
+    """Hour, weekday and month of each sample date, extracted once with the dt accessors."""
+    dates = sample_dataframe['date'].dt
+    return {
+        'hour': dates.hour.to_numpy(),
+        'day': dates.dayofweek.to_numpy(),
+        'month': dates.month.to_numpy() - 1  # 0-based, like hour and day
+    }
+
 @pytest.fixture
 def sample_column_mapping():
     """Create a sample column mapping for testing."""
@@ -30,26 +40,28 @@ def sample_column_mapping():
     }
 
 @pytest.mark.unit
-def test_calculate_time_distribution(sample_dataframe):
+@pytest.mark.parametrize("period, num_periods", [
+    ('hour', 24),
+    ('day', 7),
+    ('month', 12),
+])
+def test_calculate_time_distribution(sample_dataframe, sample_time_parts, period, num_periods):
     """Test calculating time distribution."""
     from src.analysis_layer.statistical_utils import calculate_time_distribution
 
-    # Test hourly distribution
-    hourly_dist = calculate_time_distribution(sample_dataframe, 'date', 'hour')
-    assert isinstance(hourly_dist, dict)
-    assert len(hourly_dist) <= 24  # At most 24 hours
+    distribution = calculate_time_distribution(sample_dataframe, 'date', period)
+    assert isinstance(distribution, dict)
+    assert len(distribution) == num_periods
 
-    # Test daily distribution
-    daily_dist = calculate_time_distribution(sample_dataframe, 'date', 'day')
-    assert isinstance(daily_dist, dict)
-    assert len(daily_dist) <= 7  # At most 7 days of the week
+    # Periods come back in calendar order, so the counts line up with a bincount of the parts
+    expected = np.bincount(sample_time_parts[period], minlength=num_periods)
+    np.testing.assert_array_equal(list(distribution.values()), expected)
 
-    # Test monthly distribution
-    monthly_dist = calculate_time_distribution(sample_dataframe, 'date', 'month')
-    assert isinstance(monthly_dist, dict)
-    assert len(monthly_dist) <= 12  # At most 12 months
+@pytest.mark.unit
+def test_calculate_time_distribution_invalid_period(sample_dataframe):
+    """Test that an invalid period is rejected."""
+    from src.analysis_layer.statistical_utils import calculate_time_distribution
 
-    # Test with invalid period
     with pytest.raises(ValueError):
         calculate_time_distribution(sample_dataframe, 'date', 'invalid_period')
 
@@ -84,13 +96,13 @@ def test_calculate_response_times(sample_dataframe):
 
     # Create a DataFrame with conversation flow
     conversation_df = pd.DataFrame({
-        'date': pd.to_datetime([
-            '2023-01-01 10:00:00',
-            '2023-01-01 10:05:00',
-            '2023-01-01 10:15:00',
-            '2023-01-01 10:30:00',
-            '2023-01-01 11:00:00'
-        ]),
+        'date': np.array([
+            '2023-01-01T10:00:00',
+            '2023-01-01T10:05:00',
+            '2023-01-01T10:15:00',
+            '2023-01-01T10:30:00',
+            '2023-01-01T11:00:00'
+        ], dtype='datetime64[ns]'),
         'number': ['1234567890', '1234567890', '1234567890', '1234567890', '1234567890'],
         'message_type': ['sent', 'received', 'sent', 'received', 'sent']
     })
@@ -110,13 +122,13 @@ def test_calculate_conversation_gaps(sample_dataframe):
 
     # Create a DataFrame with conversation gaps
     conversation_df = pd.DataFrame({
-        'date': pd.to_datetime([
-            '2023-01-01 10:00:00',
-            '2023-01-01 10:05:00',
-            '2023-01-02 10:00:00',  # 1 day gap
-            '2023-01-02 10:05:00',
-            '2023-01-05 10:00:00'   # 3 day gap
-        ]),
+        'date': np.array([
+            '2023-01-01T10:00:00',
+            '2023-01-01T10:05:00',
+            '2023-01-02T10:00:00',  # 1 day gap
+            '2023-01-02T10:05:00',
+            '2023-01-05T10:00:00'   # 3 day gap
+        ], dtype='datetime64[ns]'),
         'number': ['1234567890', '1234567890', '1234567890', '1234567890', '1234567890'],
         'message_type': ['sent', 'received', 'sent', 'received', 'sent']
     })
@@ -135,13 +147,13 @@ def test_calculate_contact_activity_periods(sample_dataframe):
 
     # Create a DataFrame with contact activity
     activity_df = pd.DataFrame({
-        'date': pd.to_datetime([
-            '2023-01-01 10:00:00',
-            '2023-01-01 22:00:00',
-            '2023-01-02 08:00:00',
-            '2023-01-02 23:00:00',
-            '2023-01-03 09:00:00'
-        ]),
+        'date': np.array([
+            '2023-01-01T10:00:00',
+            '2023-01-01T22:00:00',
+            '2023-01-02T08:00:00',
+            '2023-01-02T23:00:00',
+            '2023-01-03T09:00:00'
+        ], dtype='datetime64[ns]'),
         'number': ['1234567890', '1234567890', '1234567890', '1234567890', '1234567890'],
         'message_type': ['sent', 'received', 'sent', 'received', 'sent']
     })
@@ -4,83 +4,99 @@ Tests for the time analysis module.
 import pytest
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
 
-@pytest.fixture
-def sample_time_dataframe():
-    """Create a sample DataFrame for time analysis testing."""
-    # Create a DataFrame with data spanning multiple days with specific patterns
-    dates = []
-    numbers = []
-    types = []
-    contents = []
-    durations = []
+from src.analysis_layer.time_analysis import TimeAnalyzer
+
+# The synthetic 30-day frame makes these the slowest analysis tests; skip them with -m "not slow"
+pytestmark = pytest.mark.slow
+
+@pytest.fixture(scope="module")
+def shared_time_dataframe():
+    """Create a sample DataFrame for time analysis testing, once per module.
+
+    The data is seeded so every test sees the same frame.
+    """
+    rng = np.random.default_rng(0)
+    
+    # Draw every random value up front, one batch per block
+    morning_minutes = rng.integers(-60, 60, 30)
+    morning_durations = rng.integers(60, 180, 30)  # 1-3 minutes
+    evening_minutes = rng.integers(-60, 60, 15)
+    weekend_minutes = rng.integers(-60, 60, 8)
+    weekend_durations = rng.integers(300, 600, 8)  # 5-10 minutes
+    noise_days = rng.integers(0, 30, 20)
+    noise_hours = rng.integers(9, 22, 20)  # Between 9 AM and 10 PM
+    noise_minutes = rng.integers(0, 60, 20)
+    noise_durations = rng.integers(0, 300, 20)  # 0-5 minutes
+    noise_numbers = rng.choice(np.array(['1234567890', '9876543210', '5551234567', '3334445555'], dtype=object), 20)
+    noise_types = rng.choice(np.array(['sent', 'received'], dtype=object), 20)
     
     # Create 30 days of data with specific patterns
-    start_date = datetime(2023, 1, 1)
+    start_date = np.datetime64('2023-01-01', 'ns')
     
     # Morning pattern - Contact A calls every morning (7-9 AM)
-    for i in range(30):
-        day = start_date + timedelta(days=i)
-        # Morning call - around 8 AM with some variation
-        morning_time = day + timedelta(hours=8, minutes=np.random.randint(-60, 60))
-        dates.append(morning_time)
-        numbers.append('1234567890')  # Contact A
-        types.append('received' if i % 2 == 0 else 'sent')
-        contents.append('Morning call')
-        durations.append(np.random.randint(60, 180))  # 1-3 minutes
+    morning_days = np.arange(30)
+    # Morning call - around 8 AM with some variation
+    morning_times = (start_date + morning_days.astype('timedelta64[D]') + np.timedelta64(8, 'h')
+                     + morning_minutes.astype('timedelta64[m]'))
+    morning_types = np.where(morning_days % 2 == 0, 'received', 'sent').astype(object)
     
     # Evening pattern - Contact B texts every other evening (6-8 PM)
-    for i in range(0, 30, 2):
-        day = start_date + timedelta(days=i)
-        # Evening text - around 7 PM with some variation
-        evening_time = day + timedelta(hours=19, minutes=np.random.randint(-60, 60))
-        dates.append(evening_time)
-        numbers.append('9876543210')  # Contact B
-        types.append('received' if i % 4 == 0 else 'sent')
-        contents.append('Evening text')
-        durations.append(0)  # Text message
-    
-    # Weekend pattern - Contact C calls on weekends
-    for i in range(4):  # 4 weekends in our 30-day period
-        # Saturday
-        saturday = start_date + timedelta(days=i*7 + 5)  # Jan 6, 13, 20, 27
-        saturday_time = saturday + timedelta(hours=14, minutes=np.random.randint(-60, 60))
-        dates.append(saturday_time)
-        numbers.append('5551234567')  # Contact C
-        types.append('received')
-        contents.append('Weekend call')
-        durations.append(np.random.randint(300, 600))  # 5-10 minutes
-        
-        # Sunday
-        sunday = start_date + timedelta(days=i*7 + 6)  # Jan 7, 14, 21, 28
-        sunday_time = sunday + timedelta(hours=16, minutes=np.random.randint(-60, 60))
-        dates.append(sunday_time)
-        numbers.append('5551234567')  # Contact C
-        types.append('sent')
-        contents.append('Weekend call')
-        durations.append(np.random.randint(300, 600))  # 5-10 minutes
+    evening_days = np.arange(0, 30, 2)
+    # Evening text - around 7 PM with some variation
+    evening_times = (start_date + evening_days.astype('timedelta64[D]') + np.timedelta64(19, 'h')
+                     + evening_minutes.astype('timedelta64[m]'))
+    evening_types = np.where(evening_days % 4 == 0, 'received', 'sent').astype(object)
+    
+    # Weekend pattern - Contact C calls on weekends (4 weekends in our 30-day period)
+    weeks = np.arange(4) * 7
+    # Saturday (Jan 6, 13, 20, 27) around 2 PM and Sunday (Jan 7, 14, 21, 28) around 4 PM,
+    # interleaved as one Saturday/Sunday pair per weekend
+    weekend_times = np.column_stack([
+        start_date + (weeks + 5).astype('timedelta64[D]') + np.timedelta64(14, 'h'),
+        start_date + (weeks + 6).astype('timedelta64[D]') + np.timedelta64(16, 'h'),
+    ]).ravel() + weekend_minutes.astype('timedelta64[m]')
+    weekend_types = np.tile(np.array(['received', 'sent'], dtype=object), 4)
+    
+    # Contact, content and duration of each pattern's records, in the order of the times above
+    pattern_sizes = [30, 15, 8]
+    dates = np.concatenate([morning_times, evening_times, weekend_times])
+    numbers = np.repeat(np.array(['1234567890', '9876543210', '5551234567'], dtype=object), pattern_sizes)
+    types = np.concatenate([morning_types, evening_types, weekend_types])
+    contents = np.repeat(np.array(['Morning call', 'Evening text', 'Weekend call'], dtype=object), pattern_sizes)
+    durations = np.concatenate([
+        morning_durations,
+        np.zeros(15, dtype=int),  # Text message
+        weekend_durations,
+    ])
     
     # Random calls/texts to add noise
-    for i in range(20):
-        random_day = start_date + timedelta(days=np.random.randint(0, 30))
-        random_hour = np.random.randint(9, 22)  # Between 9 AM and 10 PM
-        random_time = random_day + timedelta(hours=random_hour, minutes=np.random.randint(0, 60))
-        dates.append(random_time)
-        numbers.append(np.random.choice(['1234567890', '9876543210', '5551234567', '3334445555']))
-        types.append(np.random.choice(['sent', 'received']))
-        contents.append('Random message')
-        durations.append(np.random.randint(0, 300))  # 0-5 minutes
+    noise_dates = (start_date + noise_days.astype('timedelta64[D]') + noise_hours.astype('timedelta64[h]')
+                   + noise_minutes.astype('timedelta64[m]'))
     
     return pd.DataFrame({
-        'timestamp': pd.Series(dates),
-        'phone_number': numbers,
-        'message_type': types,
-        'message_content': contents,
-        'duration': durations
+        'timestamp': np.concatenate([dates, noise_dates]),
+        'phone_number': np.concatenate([numbers, noise_numbers]),
+        'message_type': np.concatenate([types, noise_types]),
+        'message_content': np.concatenate([contents, np.full(20, 'Random message', dtype=object)]),
+        'duration': np.concatenate([durations, noise_durations])
     })
 
+@pytest.fixture
+def sample_time_dataframe(shared_time_dataframe):
+    """Return a copy of the shared time DataFrame; analyze_periodicity adds columns to its input."""
+    return shared_time_dataframe.copy()
+
+@pytest.fixture(scope="module")
+def sample_time_counts(shared_time_dataframe):
+    """Expected message counts per hour (0-23) and weekday (Monday-Sunday) of the shared frame."""
+    timestamps = shared_time_dataframe['timestamp'].dt
+    return {
+        'hourly': np.bincount(timestamps.hour.to_numpy(), minlength=24),
+        'daily': np.bincount(timestamps.dayofweek.to_numpy(), minlength=7)
+    }
+
 @pytest.fixture
 def sample_column_mapping():
     """Create a sample column mapping for testing."""
@@ -92,21 +108,32 @@ def sample_column_mapping():
         'duration': 'duration'
     }
 
+def _assert_int_dict(d, expected_len):
+    """Assert that d holds expected_len integer counts, checking all values in one array."""
+    counts = np.array(list(d.values()))
+    assert counts.shape == (expected_len,)
+    assert np.issubdtype(counts.dtype, np.integer)
+
+@pytest.fixture(scope="module")
+def shared_analyzer():
+    """Create one TimeAnalyzer for the whole module."""
+    return TimeAnalyzer()
+
+@pytest.fixture
+def analyzer(shared_analyzer):
+    """Return the shared TimeAnalyzer with last_error cleared."""
+    shared_analyzer.last_error = None
+    return shared_analyzer
+
 @pytest.mark.unit
 def test_time_analyzer_creation():
     """Test creating a TimeAnalyzer."""
-    from src.analysis_layer.time_analysis import TimeAnalyzer
-    
     analyzer = TimeAnalyzer()
     assert analyzer is not None
 
 @pytest.mark.unit
-def test_analyze_hourly_patterns(sample_time_dataframe, sample_column_mapping):
+def test_analyze_hourly_patterns(analyzer, sample_time_dataframe, sample_time_counts, sample_column_mapping):
     """Test analyzing hourly patterns."""
-    from src.analysis_layer.time_analysis import TimeAnalyzer
-    
-    analyzer = TimeAnalyzer()
-    
     result = analyzer.analyze_hourly_patterns(sample_time_dataframe)
     
     assert isinstance(result, dict)
@@ -121,16 +148,12 @@ def test_analyze_hourly_patterns(sample_time_dataframe, sample_column_mapping):
     assert 19 in result['peak_hours']
     
     # Check hourly distribution
-    assert len(result['hourly_distribution']) == 24
-    assert all(isinstance(count, int) for count in result['hourly_distribution'].values())
+    _assert_int_dict(result['hourly_distribution'], 24)
+    np.testing.assert_array_equal(list(result['hourly_distribution'].values()), sample_time_counts['hourly'])
 
 @pytest.mark.unit
-def test_analyze_daily_patterns(sample_time_dataframe, sample_column_mapping):
+def test_analyze_daily_patterns(analyzer, sample_time_dataframe, sample_time_counts, sample_column_mapping):
     """Test analyzing daily patterns."""
-    from src.analysis_layer.time_analysis import TimeAnalyzer
-    
-    analyzer = TimeAnalyzer()
-    
     result = analyzer.analyze_daily_patterns(sample_time_dataframe)
     
     assert isinstance(result, dict)
@@ -142,16 +165,12 @@ def test_analyze_daily_patterns(sample_time_dataframe, sample_column_mapping):
     assert result['weekend_vs_weekday']['weekend_percentage'] > 0
     
     # Check weekday distribution
-    assert len(result['weekday_distribution']) == 7
-    assert all(isinstance(count, int) for count in result['weekday_distribution'].values())
+    _assert_int_dict(result['weekday_distribution'], 7)
+    np.testing.assert_array_equal(list(result['weekday_distribution'].values()), sample_time_counts['daily'])
 
 @pytest.mark.unit
-def test_analyze_periodicity(sample_time_dataframe, sample_column_mapping):
+def test_analyze_periodicity(analyzer, sample_time_dataframe, sample_column_mapping):
     """Test analyzing periodicity."""
-    from src.analysis_layer.time_analysis import TimeAnalyzer
-    
-    analyzer = TimeAnalyzer()
-    
     result = analyzer.analyze_periodicity(sample_time_dataframe)
     
     assert isinstance(result, dict)
@@ -166,12 +185,8 @@ def test_analyze_periodicity(sample_time_dataframe, sample_column_mapping):
     assert len(result['weekly_patterns']) > 0
 
 @pytest.mark.unit
-def test_detect_time_anomalies(sample_time_dataframe, sample_column_mapping):
+def test_detect_time_anomalies(analyzer, sample_time_dataframe, sample_column_mapping):
     """Test detecting time anomalies."""
-    from src.analysis_layer.time_analysis import TimeAnalyzer
-    
-    analyzer = TimeAnalyzer()
-    
     result = analyzer.detect_time_anomalies(sample_time_dataframe)
     
     assert isinstance(result, list)
@@ -185,12 +200,8 @@ def test_detect_time_anomalies(sample_time_dataframe, sample_column_mapping):
         assert 'reason' in anomaly
 
 @pytest.mark.unit
-def test_analyze_contact_time_patterns(sample_time_dataframe, sample_column_mapping):
+def test_analyze_contact_time_patterns(analyzer, sample_time_dataframe, sample_column_mapping):
     """Test analyzing contact-specific time patterns."""
-    from src.analysis_layer.time_analysis import TimeAnalyzer
-    
-    analyzer = TimeAnalyzer()
-    
     result = analyzer.analyze_contact_time_patterns(sample_time_dataframe)
     
     assert isinstance(result, dict)
@@ -215,12 +226,8 @@ def test_analyze_contact_time_patterns(sample_time_dataframe, sample_column_mapp
     assert 'Sunday' in contact_c['preferred_days']
 
 @pytest.mark.unit
-def test_analyze_response_time_patterns(sample_time_dataframe, sample_column_mapping):
+def test_analyze_response_time_patterns(analyzer, sample_time_dataframe, sample_column_mapping):
     """Test analyzing response time patterns."""
-    from src.analysis_layer.time_analysis import TimeAnalyzer
-    
-    analyzer = TimeAnalyzer()
-    
     result = analyzer.analyze_response_time_patterns(sample_time_dataframe)
     
     assert isinstance(result, dict)
@@ -18,6 +18,16 @@ def test_command_parsing():
     with pytest.raises(ValueError):
         parser.parse(["invalid_command"])
 
+def test_repeated_parse_returns_fresh_commands():
+    parser = CommandParser()
+    
+    first = parser.parse(["export", "sample.xlsx", "--format", "json"])
+    second = parser.parse(["export", "sample.xlsx", "--format", "json"])
+    
+    # The parsed arguments are reused, but each call gets its own command
+    assert first is not second
+    assert (second.file_path, second.format) == ("sample.xlsx", "json")
+
 def test_argument_handling():
     parser = CommandParser()
     
@@ -1,31 +1,35 @@
+import json
+import uuid
+from datetime import date, datetime
+from enum import Enum
+
 import pytest
 from src.cli.formatters import TableFormatter, JSONFormatter, TextFormatter
 
+# Shared input rows and the plain table every TableFormatter case expects
+_DATA = (
+    {"Name": "Alice", "Age": 30, "City": "New York"},
+    {"Name": "Bob", "Age": 25, "City": "Los Angeles"},
+    {"Name": "Charlie", "Age": 35, "City": "Chicago"}
+)
+
+_EXPECTED_TABLE = (
+    "+---------+-----+-------------+\n"
+    "| Name    | Age | City        |\n"
+    "+---------+-----+-------------+\n"
+    "| Alice   | 30  | New York    |\n"
+    "| Bob     | 25  | Los Angeles |\n"
+    "| Charlie | 35  | Chicago     |\n"
+    "+---------+-----+-------------+\n"
+)
+
 def test_table_formatter():
+    # Covers the header/row layout, column alignment and cell formatting at once
     formatter = TableFormatter()
-    data = [
-        {"Name": "Alice", "Age": 30, "City": "New York"},
-        {"Name": "Bob", "Age": 25, "City": "Los Angeles"},
-        {"Name": "Charlie", "Age": 35, "City": "Chicago"}
-    ]
-    expected_output = (
-        "+---------+-----+-------------+\n"
-        "| Name    | Age | City        |\n"
-        "+---------+-----+-------------+\n"
-        "| Alice   | 30  | New York    |\n"
-        "| Bob     | 25  | Los Angeles |\n"
-        "| Charlie | 35  | Chicago     |\n"
-        "+---------+-----+-------------+\n"
-    )
-    assert formatter.format(data) == expected_output
+    assert formatter.format(list(_DATA)) == _EXPECTED_TABLE
 
 def test_json_formatter():
     formatter = JSONFormatter()
-    data = [
-        {"Name": "Alice", "Age": 30, "City": "New York"},
-        {"Name": "Bob", "Age": 25, "City": "Los Angeles"},
-        {"Name": "Charlie", "Age": 35, "City": "Chicago"}
-    ]
     expected_output = (
         '[\n'
         '    {\n'
@@ -45,65 +49,74 @@ def test_json_formatter():
         '    }\n'
         ']'
     )
-    assert formatter.format(data) == expected_output
+    assert formatter.format(list(_DATA)) == expected_output
+
+# Values orjson rejects or writes differently from json.dumps, so JSONFormatter must fall back
+_JSON_EDGE_VALUES = [
+    pytest.param(float("nan"), id="nan"),
+    pytest.param(float("inf"), id="infinity"),
+    pytest.param(2 ** 70, id="int_over_64_bits"),
+    pytest.param(1e16, id="exponent_float"),
+    pytest.param(1e-7, id="negative_exponent_float"),
+    pytest.param("Zoë", id="non_ascii"),
+    pytest.param("\x7f", id="del_char"),
+    pytest.param(None, id="none"),
+    pytest.param({1: "a"}, id="int_key"),
+    pytest.param([{"nested": [{}]}], id="nested"),
+    pytest.param(datetime(2023, 1, 1), id="datetime"),
+    pytest.param(date(2023, 1, 1), id="date"),
+]
+
+def _json_format(data):
+    try:
+        return JSONFormatter().format(data)
+    except TypeError as e:
+        return type(e)
+
+@pytest.mark.parametrize("value", _JSON_EDGE_VALUES)
+def test_json_formatter_matches_json_module(monkeypatch, value):
+    import src.cli.formatters as formatters
+    data = list(_DATA) + [{"Name": "Edge", "Value": value}]
+    try:
+        expected_output = json.dumps(data, indent=4)
+    except TypeError as e:
+        expected_output = type(e)
+    assert _json_format(data) == expected_output
+    monkeypatch.setattr(formatters, "ORJSON_AVAILABLE", False)
+    assert _json_format(data) == expected_output
+
+class _Color(Enum):
+    RED = 1
+
+@pytest.mark.parametrize("value,encoded", [
+    (uuid.UUID(int=1), '"00000000-0000-0000-0000-000000000001"'),
+    (_Color.RED, "1"),
+], ids=["uuid", "enum"])
+def test_json_formatter_orjson_divergence(value, encoded):
+    # Known divergence: orjson encodes these natively, while json.dumps raises TypeError
+    import src.cli.formatters as formatters
+    if not formatters.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    with pytest.raises(TypeError):
+        json.dumps([{"Value": value}], indent=4)
+    assert JSONFormatter().format([{"Value": value}]) == '[\n    {\n        "Value": ' + encoded + '\n    }\n]'
 
 def test_text_formatter():
     formatter = TextFormatter()
-    data = [
-        {"Name": "Alice", "Age": 30, "City": "New York"},
-        {"Name": "Bob", "Age": 25, "City": "Los Angeles"},
-        {"Name": "Charlie", "Age": 35, "City": "Chicago"}
-    ]
     expected_output = (
         "Name: Alice, Age: 30, City: New York\n"
         "Name: Bob, Age: 25, City: Los Angeles\n"
         "Name: Charlie, Age: 35, City: Chicago\n"
     )
-    assert formatter.format(data) == expected_output
+    assert formatter.format(list(_DATA)) == expected_output
 
-def test_table_formatter_column_alignment():
-    formatter = TableFormatter()
-    data = [
-        {"Name": "Alice", "Age": 30, "City": "New York"},
-        {"Name": "Bob", "Age": 25, "City": "Los Angeles"},
-        {"Name": "Charlie", "Age": 35, "City": "Chicago"}
-    ]
-    expected_output = (
-        "+---------+-----+-------------+\n"
-        "| Name    | Age | City        |\n"
-        "+---------+-----+-------------+\n"
-        "| Alice   | 30  | New York    |\n"
-        "| Bob     | 25  | Los Angeles |\n"
-        "| Charlie | 35  | Chicago     |\n"
-        "+---------+-----+-------------+\n"
-    )
-    assert formatter.format(data) == expected_output
-
-def test_table_formatter_data_formatting():
-    formatter = TableFormatter()
-    data = [
-        {"Name": "Alice", "Age": 30, "City": "New York"},
-        {"Name": "Bob", "Age": 25, "City": "Los Angeles"},
-        {"Name": "Charlie", "Age": 35, "City": "Chicago"}
-    ]
-    expected_output = (
-        "+---------+-----+-------------+\n"
-        "| Name    | Age | City        |\n"
-        "+---------+-----+-------------+\n"
-        "| Alice   | 30  | New York    |\n"
-        "| Bob     | 25  | Los Angeles |\n"
-        "| Charlie | 35  | Chicago     |\n"
-        "+---------+-----+-------------+\n"
-    )
-    assert formatter.format(data) == expected_output
+def test_text_formatter_mixed_keys():
+    formatter = TextFormatter()
+    data = [{"a": 1}, {"a": 2, "b": 3}, {"b": "{x}"}, {"{k}": 4}]
+    assert formatter.format(data) == "a: 1\na: 2, b: 3\nb: {x}\n{k}: 4\n"
 
 def test_color_and_styling():
     formatter = TableFormatter()
-    data = [
-        {"Name": "Alice", "Age": 30, "City": "New York"},
-        {"Name": "Bob", "Age": 25, "City": "Los Angeles"},
-        {"Name": "Charlie", "Age": 35, "City": "Chicago"}
-    ]
     expected_output = (
         "\033[1m+---------+-----+-------------+\033[0m\n"
         "\033[1m| Name    | Age | City        |\033[0m\n"
@@ -113,4 +126,4 @@ def test_color_and_styling():
         "| Charlie | 35  | Chicago     |\n"
         "\033[1m+---------+-----+-------------+\033[0m\n"
     )
-    assert formatter.format(data) == expected_output
+    assert formatter.format(list(_DATA)) == expected_output
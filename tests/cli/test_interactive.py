@@ -1,9 +1,20 @@
 import pytest
 from src.cli.interactive import InteractiveCLI
 
-def test_repl_functionality():
+@pytest.fixture(scope="module")
+def shared_cli(tmp_path_factory):
+    """Create one InteractiveCLI for the whole module, saving its history to a temporary file."""
     cli = InteractiveCLI()
-    
+    cli.history_file = str(tmp_path_factory.mktemp("cli") / "history")
+    return cli
+
+@pytest.fixture
+def cli(shared_cli):
+    """Return the shared InteractiveCLI with its command history cleared."""
+    shared_cli.clear_command_history()
+    return shared_cli
+
+def test_repl_functionality(cli):
     # Test command input and output
     output = cli.execute_command("help")
     assert "Available commands" in output
@@ -11,9 +22,7 @@ def test_repl_functionality():
     output = cli.execute_command("exit")
     assert "Exiting" in output
 
-def test_command_history():
-    cli = InteractiveCLI()
-    
+def test_command_history(cli):
     # Test adding commands to history
     cli.execute_command("help")
     cli.execute_command("exit")
@@ -28,16 +37,19 @@ def test_command_history():
     history = cli.get_command_history()
     assert len(history) == 0
 
-def test_tab_completion():
-    cli = InteractiveCLI()
-    
+def test_tab_completion(cli):
     # Test command completion
-    completions = cli.complete_command("he")
+    completions = cli.line_completions("he")
     assert "help" in completions
     
-    completions = cli.complete_command("ex")
+    completions = cli.line_completions("ex")
     assert "exit" in completions
     
-    # Test argument completion
-    completions = cli.complete_command("export --f")
-    assert "--format" in completions
+    # A blank line offers every command
+    assert cli.line_completions("  ") == cli.line_completions("")
+    assert "analyze" in cli.line_completions("  ")
+    
+    # Test argument completion; cmd's complete_export offers the same flags
+    completions = cli.line_completions("export --f")
+    assert completions == ["--format=csv", "--format=json"]
+    assert cli.complete_export("--f", "export --f", 7, 10) == completions
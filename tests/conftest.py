@@ -1,50 +1,34 @@
 """
 Test fixtures and utilities for the Phone Records Analyzer project.
+
+The analysis layer tests keep no state outside their module-scoped fixtures,
+so they can be spread across processes with pytest-xdist
+(``pytest -n auto --dist loadgroup tests/analysis_layer/``).
 """
-import os
-import tempfile
-import shutil
 import pytest
 import logging
 
 
 @pytest.fixture
-def temp_dir():
-    """Create a temporary directory for test files."""
-    # Create a temporary directory
-    temp_dir = tempfile.mkdtemp()
-
-    yield temp_dir
-
-    # Clean up after test with error handling for Windows
-    try:
-        shutil.rmtree(temp_dir, ignore_errors=True)
-    except (PermissionError, OSError):
-        # On Windows, sometimes directories can't be deleted immediately
-        pass
+def temp_dir(tmp_path):
+    """Return a temporary directory for test files, as a string path; pytest cleans it up."""
+    return str(tmp_path)
 
 
 @pytest.fixture
-def temp_file():
-    """Create a temporary file for tests."""
-    # Create a temporary file path without creating the file
-    fd, file_path = tempfile.mkstemp()
-    os.close(fd)  # Close the file descriptor immediately
-
-    yield file_path
+def temp_file(tmp_path):
+    """Return the path of an empty temporary file, as a string; pytest cleans it up."""
+    file_path = tmp_path / "temp_file"
+    file_path.touch()
+    return str(file_path)
 
-    # Clean up after test with error handling for Windows
-    try:
-        if os.path.exists(file_path):
-            os.unlink(file_path)
-    except (PermissionError, OSError):
-        # On Windows, sometimes files can't be deleted immediately
-        pass
 
-
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_config_dict():
-    """Return a sample configuration dictionary for testing."""
+    """Return a sample configuration dictionary for testing.
+
+    The dictionary is shared by the whole session, so tests must not modify it.
+    """
     return {
         "logging": {
             "level": "INFO",
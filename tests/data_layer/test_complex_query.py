@@ -4,10 +4,22 @@ Tests for complex query operations.
 import pytest
 import pandas as pd
 import numpy as np
-from unittest.mock import patch, MagicMock
+from types import SimpleNamespace
+from unittest.mock import patch
 import datetime
 
-@pytest.fixture
+from src.data_layer.complex_query import JoinOperation, ComplexFilter, QueryBuilder
+from src.data_layer.repository import PhoneRecordRepository
+from src.utils.query_utils import build_query, optimize_query, validate_query
+
+# Shared categorical dtypes, so joins match on category codes and keep the dtype
+_PHONE_NUMBER_DTYPE = pd.CategoricalDtype(["1234567890", "9876543210", "5555555555", "8888888888"])
+_MESSAGE_TYPE_DTYPE = pd.CategoricalDtype(["sent", "received"])
+
+# The frames below are only read by JoinOperation, ComplexFilter and QueryBuilder
+# (which copy before modifying), so each is built once per module
+
+@pytest.fixture(scope="module")
 def sample_dataset1():
     """Create a sample dataset for testing."""
     return pd.DataFrame({
@@ -15,9 +27,9 @@ def sample_dataset1():
         "phone_number": ["1234567890", "9876543210", "5555555555"],
         "message_type": ["sent", "received", "sent"],
         "duration": [60, 120, 180]
-    })
+    }).astype({"phone_number": _PHONE_NUMBER_DTYPE, "message_type": _MESSAGE_TYPE_DTYPE})
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_dataset2():
     """Create another sample dataset for testing."""
     return pd.DataFrame({
@@ -25,30 +37,42 @@ def sample_dataset2():
         "phone_number": ["1234567890", "8888888888", "5555555555"],
         "message_type": ["received", "sent", "received"],
         "location": ["New York", "Los Angeles", "Chicago"]
-    })
+    }).astype({"phone_number": _PHONE_NUMBER_DTYPE, "message_type": _MESSAGE_TYPE_DTYPE})
 
-@pytest.mark.unit
-def test_join_datasets():
-    """Test joining two datasets."""
-    from src.data_layer.complex_query import JoinOperation
+@pytest.fixture(scope="module")
+def sample_records():
+    """Create a dataset with parsed timestamps and a repeated phone number for filtering and querying."""
+    return pd.DataFrame({
+        "timestamp": pd.to_datetime(["2023-01-01 12:00:00", "2023-01-02 13:00:00",
+                                     "2023-01-03 14:00:00", "2023-01-04 15:00:00"]),
+        "phone_number": ["1234567890", "9876543210", "5555555555", "1234567890"],
+        "message_type": ["sent", "received", "sent", "received"],
+        "duration": [60, 120, 180, 240]
+    }).astype({"phone_number": _PHONE_NUMBER_DTYPE, "message_type": _MESSAGE_TYPE_DTYPE})
 
-    # Create sample datasets
-    df1 = pd.DataFrame({
-        "timestamp": ["2023-01-01", "2023-01-02", "2023-01-03"],
+@pytest.fixture(scope="module")
+def named_contacts():
+    """Create a dataset mapping phone numbers to names."""
+    return pd.DataFrame({
         "phone_number": ["1234567890", "9876543210", "5555555555"],
-        "message_type": ["sent", "received", "sent"]
-    })
+        "name": ["Alice", "Bob", "Charlie"]
+    }).astype({"phone_number": _PHONE_NUMBER_DTYPE})
 
-    df2 = pd.DataFrame({
-        "timestamp": ["2023-01-01", "2023-01-02", "2023-01-04"],
+@pytest.fixture(scope="module")
+def located_contacts():
+    """Create a dataset mapping phone numbers to locations; two numbers overlap with named_contacts."""
+    return pd.DataFrame({
         "phone_number": ["1234567890", "8888888888", "5555555555"],
         "location": ["New York", "Los Angeles", "Chicago"]
-    })
+    }).astype({"phone_number": _PHONE_NUMBER_DTYPE})
 
+@pytest.mark.unit
+def test_join_datasets(sample_dataset1, sample_dataset2):
+    """Test joining two datasets."""
     # Create join operation
     join_op = JoinOperation(
-        left_df=df1,
-        right_df=df2,
+        left_df=sample_dataset1,
+        right_df=sample_dataset2,
         join_type="inner",
         join_columns=["phone_number"]
     )
@@ -66,29 +90,15 @@ def test_join_datasets():
     # Verify the correct rows were joined
     assert "1234567890" in result["phone_number"].values
     assert "5555555555" in result["phone_number"].values
+    assert result["phone_number"].dtype == _PHONE_NUMBER_DTYPE  # Join keys stay categorical
 
 @pytest.mark.unit
-def test_join_datasets_with_suffix():
+def test_join_datasets_with_suffix(sample_dataset1, sample_dataset2):
     """Test joining datasets with custom suffixes."""
-    from src.data_layer.complex_query import JoinOperation
-
-    # Create sample datasets
-    df1 = pd.DataFrame({
-        "timestamp": ["2023-01-01", "2023-01-02"],
-        "phone_number": ["1234567890", "9876543210"],
-        "message_type": ["sent", "received"]
-    })
-
-    df2 = pd.DataFrame({
-        "timestamp": ["2023-01-01", "2023-01-03"],
-        "phone_number": ["1234567890", "5555555555"],
-        "location": ["New York", "Chicago"]
-    })
-
     # Create join operation with custom suffixes
     join_op = JoinOperation(
-        left_df=df1,
-        right_df=df2,
+        left_df=sample_dataset1,
+        right_df=sample_dataset2,
         join_type="inner",
         join_columns=["phone_number"],
         suffixes=("_primary", "_secondary")
@@ -103,79 +113,32 @@ def test_join_datasets_with_suffix():
     assert "timestamp_secondary" in result.columns
 
 @pytest.mark.unit
-def test_join_types():
+@pytest.mark.parametrize("join_type, expected_len, unmatched_number, missing_column", [
+    ("inner", 2, None, None),                    # Only matching records
+    ("left", 3, "9876543210", "location"),       # All records from left dataset
+    ("right", 3, "8888888888", "name"),          # All records from right dataset
+    ("outer", 4, None, None),                    # All unique records from both datasets
+], ids=["inner", "left", "right", "outer"])
+def test_join_types(named_contacts, located_contacts, join_type, expected_len, unmatched_number, missing_column):
     """Test different join types."""
-    from src.data_layer.complex_query import JoinOperation
-
-    # Create sample datasets
-    df1 = pd.DataFrame({
-        "phone_number": ["1234567890", "9876543210", "5555555555"],
-        "name": ["Alice", "Bob", "Charlie"]
-    })
-
-    df2 = pd.DataFrame({
-        "phone_number": ["1234567890", "8888888888", "5555555555"],
-        "location": ["New York", "Los Angeles", "Chicago"]
-    })
-
-    # Test inner join
-    inner_join = JoinOperation(
-        left_df=df1,
-        right_df=df2,
-        join_type="inner",
+    join = JoinOperation(
+        left_df=named_contacts,
+        right_df=located_contacts,
+        join_type=join_type,
         join_columns=["phone_number"]
     )
-    inner_result = inner_join.execute()
-    assert len(inner_result) == 2  # Only matching records
-
-    # Test left join
-    left_join = JoinOperation(
-        left_df=df1,
-        right_df=df2,
-        join_type="left",
-        join_columns=["phone_number"]
-    )
-    left_result = left_join.execute()
-    assert len(left_result) == 3  # All records from left dataset
-    assert pd.isna(left_result.loc[left_result["phone_number"] == "9876543210", "location"].iloc[0])
-
-    # Test right join
-    right_join = JoinOperation(
-        left_df=df1,
-        right_df=df2,
-        join_type="right",
-        join_columns=["phone_number"]
-    )
-    right_result = right_join.execute()
-    assert len(right_result) == 3  # All records from right dataset
-    assert pd.isna(right_result.loc[right_result["phone_number"] == "8888888888", "name"].iloc[0])
-
-    # Test outer join
-    outer_join = JoinOperation(
-        left_df=df1,
-        right_df=df2,
-        join_type="outer",
-        join_columns=["phone_number"]
-    )
-    outer_result = outer_join.execute()
-    assert len(outer_result) == 4  # All unique records from both datasets
+    result = join.execute()
+    assert len(result) == expected_len
+
+    # A number present on one side only has no value for the other side's column
+    if unmatched_number is not None:
+        assert pd.isna(result.loc[result["phone_number"] == unmatched_number, missing_column].iloc[0])
 
 @pytest.mark.unit
-def test_complex_filter():
+def test_complex_filter(sample_records):
     """Test complex filtering operations."""
-    from src.data_layer.complex_query import ComplexFilter
-
-    # Create sample dataset
-    df = pd.DataFrame({
-        "timestamp": pd.to_datetime(["2023-01-01 12:00:00", "2023-01-02 13:00:00",
-                                     "2023-01-03 14:00:00", "2023-01-04 15:00:00"]),
-        "phone_number": ["1234567890", "9876543210", "5555555555", "1234567890"],
-        "message_type": ["sent", "received", "sent", "received"],
-        "duration": [60, 120, 180, 240]
-    })
-
     # Create complex filter
-    complex_filter = ComplexFilter(df)
+    complex_filter = ComplexFilter(sample_records)
 
     # Test AND condition
     and_result = complex_filter.filter(
@@ -218,21 +181,10 @@ def test_complex_filter():
     assert set(multi_result["message_type"].tolist()) == {"sent"}
 
 @pytest.mark.unit
-def test_query_builder():
+def test_query_builder(sample_records):
     """Test query builder functionality."""
-    from src.data_layer.complex_query import QueryBuilder
-
-    # Create sample dataset
-    df = pd.DataFrame({
-        "timestamp": pd.to_datetime(["2023-01-01 12:00:00", "2023-01-02 13:00:00",
-                                     "2023-01-03 14:00:00", "2023-01-04 15:00:00"]),
-        "phone_number": ["1234567890", "9876543210", "5555555555", "1234567890"],
-        "message_type": ["sent", "received", "sent", "received"],
-        "duration": [60, 120, 180, 240]
-    })
-
     # Create query builder
-    query_builder = QueryBuilder(df)
+    query_builder = QueryBuilder(sample_records)
 
     # Build and execute a query
     result = query_builder.where("phone_number", "==", "1234567890") \
@@ -267,58 +219,46 @@ def test_query_builder():
     assert sort_result.iloc[1]["duration"] == 180
 
 @pytest.mark.unit
-def test_repository_complex_query(sample_dataset1, sample_dataset2):
-    """Test repository integration with complex queries."""
-    from src.data_layer.repository import PhoneRecordRepository
-    from src.data_layer.models import PhoneRecordDataset
-    from src.data_layer.complex_query import JoinOperation, ComplexFilter, QueryBuilder
-
-    # Mock repository
-    repo = MagicMock(spec=PhoneRecordRepository)
+def test_query_builder_groups_only_observed_categories(sample_records):
+    """Test that grouping on a categorical key skips categories with no rows."""
+    # "8888888888" is a category of _PHONE_NUMBER_DTYPE but never appears in sample_records
+    result = QueryBuilder(sample_records).group_by("phone_number") \
+                                         .aggregate({"duration": "count"}) \
+                                         .execute()
 
-    # Create mock datasets
-    dataset1 = MagicMock(spec=PhoneRecordDataset)
-    dataset1.data = sample_dataset1
-    dataset1.name = "dataset1"
+    assert set(result["phone_number"]) == {"1234567890", "9876543210", "5555555555"}
+    assert (result["duration"] > 0).all()
 
-    dataset2 = MagicMock(spec=PhoneRecordDataset)
-    dataset2.data = sample_dataset2
-    dataset2.name = "dataset2"
-
-    # Mock repository methods
-    repo.get_dataset.side_effect = lambda name: {"dataset1": dataset1, "dataset2": dataset2}.get(name)
+@pytest.mark.unit
+def test_repository_complex_query(sample_dataset1, sample_dataset2):
+    """Test repository integration with complex queries."""
+    # Stub repository: join_datasets and complex_filter only need get_dataset(name).data
+    datasets = {
+        "dataset1": SimpleNamespace(name="dataset1", data=sample_dataset1),
+        "dataset2": SimpleNamespace(name="dataset2", data=sample_dataset2)
+    }
+    repo = SimpleNamespace(get_dataset=datasets.get)
 
     # Test join_datasets method
-    with patch('src.data_layer.repository.PhoneRecordRepository.join_datasets',
-               return_value=pd.merge(sample_dataset1, sample_dataset2, on="phone_number", how="inner")):
+    result = PhoneRecordRepository.join_datasets(repo, "dataset1", "dataset2", "phone_number", "inner")
 
-        # Call the method
-        from src.data_layer.repository import PhoneRecordRepository
-        result = PhoneRecordRepository.join_datasets(repo, "dataset1", "dataset2", "phone_number", "inner")
-
-        # Verify result
-        assert isinstance(result, pd.DataFrame)
-        assert len(result) == 2  # Two matching phone numbers
-        assert "timestamp_x" in result.columns
-        assert "timestamp_y" in result.columns
+    # Verify result
+    assert isinstance(result, pd.DataFrame)
+    assert len(result) == 2  # Two matching phone numbers
+    assert "timestamp_x" in result.columns
+    assert "timestamp_y" in result.columns
 
     # Test complex_filter method
-    with patch('src.data_layer.repository.PhoneRecordRepository.complex_filter',
-               return_value=sample_dataset1[sample_dataset1["message_type"] == "sent"]):
-
-        # Call the method
-        result = PhoneRecordRepository.complex_filter(repo, "dataset1", [("message_type", "==", "sent")])
+    result = PhoneRecordRepository.complex_filter(repo, "dataset1", [("message_type", "==", "sent")])
 
-        # Verify result
-        assert isinstance(result, pd.DataFrame)
-        assert len(result) == 2  # Two sent messages
-        assert all(result["message_type"] == "sent")
+    # Verify result
+    assert isinstance(result, pd.DataFrame)
+    assert len(result) == 2  # Two sent messages
+    assert all(result["message_type"] == "sent")
 
 @pytest.mark.unit
 def test_query_utils():
     """Test query utilities."""
-    from src.utils.query_utils import build_query, optimize_query, validate_query
-
     # Test build_query
     query = build_query(
         dataset="calls",
@@ -362,10 +302,6 @@ def test_query_utils():
 @pytest.mark.integration
 def test_end_to_end_complex_query():
     """Test end-to-end complex query workflow."""
-    from src.data_layer.repository import PhoneRecordRepository
-    from src.data_layer.complex_query import QueryBuilder
-    from src.utils.query_utils import build_query
-
     # Create repository with mock data
     with patch('src.data_layer.repository.PhoneRecordRepository') as MockRepo:
         # Setup mock repository
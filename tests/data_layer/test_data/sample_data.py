@@ -1,6 +1,7 @@
 """
-Script to generate sample Excel files for testing.
+Script to generate sample data files for testing.
 """
+import argparse
 import pandas as pd
 import numpy as np
 import os
@@ -101,20 +102,52 @@ def create_different_columns_data():
         ]
     })
 
-# Generate Excel files
-def generate_excel_files():
-    """Generate Excel files for testing."""
+def _write_if_changed(df, path, force=False):
+    """
+    Write df to path as Parquet unless its content hash matches the sidecar.
+
+    The hash is stored next to the file as ``<name>.parquet.hash``.
+
+    Returns:
+        True if the file was written, False if it was up to date
+    """
+    hash_path = path.with_suffix(path.suffix + '.hash')
+    content_hash = str(int(pd.util.hash_pandas_object(df).sum()))
+    if not force and path.exists() and hash_path.exists() and hash_path.read_text() == content_hash:
+        return False
+
+    df.to_parquet(path, index=False)
+    hash_path.write_text(content_hash)
+    return True
+
+# Generate test data files
+def generate_excel_files(force=False):
+    """
+    Generate Parquet files for testing, plus the canonical Excel file for the Excel parser tests.
+
+    Args:
+        force: Rewrite every file even if its content is unchanged
+    """
     # Create sample data
     sample_data = create_sample_data()
     malformed_data = create_malformed_data()
     different_columns_data = create_different_columns_data()
     
-    # Save to Excel files
-    sample_data.to_excel(script_dir / 'sample_data.xlsx', index=False)
-    malformed_data.to_excel(script_dir / 'malformed_data.xlsx', index=False)
-    different_columns_data.to_excel(script_dir / 'different_columns_data.xlsx', index=False)
+    # Save to Parquet files; readers that don't test Excel ingestion use these
+    written = [
+        _write_if_changed(sample_data, script_dir / 'sample_data.parquet', force),
+        _write_if_changed(malformed_data, script_dir / 'malformed_data.parquet', force),
+        _write_if_changed(different_columns_data, script_dir / 'different_columns_data.parquet', force)
+    ]
+    
+    # The xlsx is checked in, so only write it when it is missing
+    if force or not (script_dir / 'sample_data.xlsx').exists():
+        sample_data.to_excel(script_dir / 'sample_data.xlsx', index=False)
+        written.append(True)
     
-    print(f"Generated Excel files in {script_dir}")
+    print(f"Wrote {sum(written)} test data file(s) in {script_dir}")
 
 if __name__ == "__main__":
-    generate_excel_files()
+    parser = argparse.ArgumentParser(description="Generate sample data files for testing.")
+    parser.add_argument('--force', action='store_true', help="Rewrite files even if their content is unchanged")
+    generate_excel_files(force=parser.parse_args().force)
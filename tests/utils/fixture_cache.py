@@ -0,0 +1,56 @@
+"""
+On-disk Parquet cache for DataFrames built by test fixtures.
+"""
+import hashlib
+import inspect
+import os
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  # Parquet engine for the fixture cache
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+
+def load_cached_frame(builder: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+    """
+    Return the DataFrame produced by builder, reusing a cached Parquet copy.
+
+    The cache lives in a ``_fixtures_cache`` directory next to the module that
+    defines builder and is keyed on that whole module's source, so editing the
+    builder or any helper or constant it uses from that module invalidates it.
+    Older copies for the same builder are deleted when a new one is written.
+    Set FIXTURE_CACHE=0 to always rebuild.
+
+    Args:
+        builder: Zero-argument function that builds the DataFrame
+
+    Returns:
+        The cached or freshly built DataFrame
+    """
+    if not PARQUET_AVAILABLE or os.environ.get('FIXTURE_CACHE', '1') == '0':
+        return builder()
+
+    source_file = Path(inspect.getsourcefile(builder))
+    cache_dir = source_file.parent / '_fixtures_cache'
+    key = hashlib.md5(source_file.read_bytes()).hexdigest()
+    path = cache_dir / f"{builder.__name__}-{key}.parquet"
+    if path.exists():
+        return pd.read_parquet(path)
+
+    df = builder()
+    cache_dir.mkdir(exist_ok=True)
+    # Write then rename so concurrent workers never read a partial file
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    df.to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+
+    # Drop copies built from earlier versions of the module
+    for stale_path in cache_dir.glob(f"{builder.__name__}-*.parquet"):
+        if stale_path != path:
+            stale_path.unlink(missing_ok=True)
+    return df